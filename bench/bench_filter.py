@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Compare FilterData.filer (per-item loop) with the vectorized FilterEngine.
+
+Usage: python -m bench.bench_filter [--items 100000] [--repeat 3]
+"""
+import argparse
+import time
+
+from bench.fixtures import auction_datasets
+from lib.filter_data import FilterData
+from lib.filter_engine import FilterEngine
+
+RULES = {"min": 130000, "max": 180000}
+
+
+def best_of(func, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def run(count, repeat):
+    datasets = auction_datasets(count)
+
+    def loop():
+        return [FilterData().filer(data, **RULES) for _, data in datasets]
+
+    def load():
+        return FilterEngine.from_datasets(datasets)
+
+    loop_time, loop_result = best_of(loop, repeat)
+    load_time, engine = best_of(load, repeat)
+    mask_time, filtered = best_of(lambda: engine.filter(**FilterEngine.legacy_rules(**RULES)), repeat)
+
+    loop_ids = sorted(item["auction_id"] for items in loop_result for item in items)
+    if loop_ids != sorted(filtered["auction_id"]):
+        raise SystemExit("FilterEngine and FilterData.filer disagree")
+
+    combined_time, _ = best_of(lambda: engine.filter(
+        min_assessed=50000, min_equity_ratio=0.3, counties=["ORANGE"],
+        date_from="2020-03-01", date_to="2022-12-31", auction_types=["FORECLOSURE"]), repeat)
+    return {
+        "items": count,
+        "matched": len(loop_ids),
+        "loop_s": loop_time,
+        "engine_load_s": load_time,
+        "engine_filter_s": mask_time,
+        "engine_combined_filter_s": combined_time,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Filter benchmark')
+    parser.add_argument('--items', type=int, default=100000, help='Number of auction items')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is kept)')
+    args = parser.parse_args()
+
+    result = run(args.items, args.repeat)
+    print(f"{result['items']} items, {result['matched']} matched")
+    print(f"FilterData.filer loop:        {result['loop_s']:.4f}s")
+    print(f"FilterEngine load (once):     {result['engine_load_s']:.4f}s")
+    print(f"FilterEngine legacy rules:    {result['engine_filter_s']:.4f}s")
+    print(f"FilterEngine combined rules:  {result['engine_combined_filter_s']:.4f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Compare the single-pass auction parser with the old per-ID rescan.
+
+Usage: python -m bench.bench_parse [--items 50 200 800] [--repeat 3]
+"""
+import argparse
+import re
+import time
+import tracemalloc
+
+from bench.fixtures import auction_payload
+from lib.parse_data import ParseData
+
+
+class RescanParseData(ParseData):
+    """The parser as it was before the single-pass index: one full-document
+    search per auction ID and a fresh pattern for every field."""
+
+    def index_items(self, html_content):
+        return _RescanIndex(html_content)
+
+    def parse_item(self, item_html, auction_id, profile):
+        auction_info = {"auction_id": auction_id}
+        for field, label, start_marker, strip_tags in profile.field_specs:
+            value = self.extract_field(item_html, label, start_marker, profile.end_marker)
+            if strip_tags:
+                value = re.sub(r'<.*?>', '', value).strip()
+            auction_info[field] = value
+        auction_info["property_address"] = profile.property_address(item_html, auction_info["property_address"])
+        auction_info["auction_status"], auction_info["sold_amount"] = self.parse_status(item_html)
+        return auction_info
+
+    def extract_field(self, html, field_label, start_marker, end_marker):
+        pattern = rf'{field_label}.*?{start_marker}(.*?){end_marker}'
+        match = re.search(pattern, html, re.DOTALL)
+        if match:
+            return match.group(1).strip()
+        return ""
+
+
+class _RescanIndex:
+    def __init__(self, html_content):
+        self.html_content = html_content
+
+    def get(self, auction_id):
+        pattern = rf'<div id=\"AITEM_{auction_id}\".*?@E_ITEM_SPACER\">&nbsp;'
+        match = re.search(pattern, self.html_content, re.DOTALL)
+        return match.group(0) if match else None
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(sizes, repeat):
+    results = []
+    for county in ("default", "orange"):
+        for size in sizes:
+            payload = auction_payload(size, county, seed=size)
+            new_items = ParseData().parse_auction_data(payload, county)
+            old_items = RescanParseData().parse_auction_data(payload, county)
+            if new_items != old_items:
+                raise SystemExit(f"Parser output differs for {county} with {size} items")
+            new_time = best_of(lambda: ParseData().parse_auction_data(payload, county), repeat)
+            old_time = best_of(lambda: RescanParseData().parse_auction_data(payload, county), repeat)
+            results.append({
+                "county": county,
+                "items": size,
+                "rescan_s": old_time,
+                "single_pass_s": new_time,
+                "speedup": old_time / new_time if new_time else float("inf"),
+            })
+    return results
+
+
+def retained_bytes(build):
+    """Memory still held by what build() returns"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return size, result
+
+
+def memory_per_item(size, county):
+    """Bytes per item kept as parsed dictionaries (money strings) vs AuctionRecords"""
+    payload = auction_payload(size, county, seed=size)
+    parse_data = ParseData()
+    html_content, auction_ids = parse_data.load_payload(payload)
+    item_index = parse_data.index_items(html_content)
+    # Warm up first so one-off imports and pattern caches aren't counted
+    parse_data.parse_records(item_index, auction_ids[:1], county, "10/01/2026")
+    dict_bytes, items = retained_bytes(lambda: parse_data.parse_items(item_index, auction_ids, county))
+    record_bytes, records = retained_bytes(
+        lambda: parse_data.parse_records(item_index, auction_ids, county, "10/01/2026"))
+    return dict_bytes / len(items), record_bytes / len(records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Auction parser benchmark')
+    parser.add_argument('--items', type=int, nargs='+', default=[50, 200, 800], help='Items per payload')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is kept)')
+    args = parser.parse_args()
+
+    print(f"{'county':<8} {'items':>6} {'rescan':>10} {'single':>10} {'speedup':>8}")
+    for row in run(args.items, args.repeat):
+        print(f"{row['county']:<8} {row['items']:>6} {row['rescan_s']:>9.4f}s {row['single_pass_s']:>9.4f}s {row['speedup']:>7.1f}x")
+
+    for county in ("default", "orange"):
+        dict_size, record_size = memory_per_item(max(args.items), county)
+        print(f"{county:<8} bytes per item: {dict_size:.0f} as dict, {record_size:.0f} as AuctionRecord")
+
+
+if __name__ == "__main__":
+    main()
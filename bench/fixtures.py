@@ -0,0 +1,170 @@
+"""Synthetic AJAX payloads and calendar pages in the realforeclose.com formats.
+
+The markup mirrors what ``ParseData`` expects from the live sites: the
+compressed ``@`` tokens, the ``AITEM_`` wrappers and the ``@E_ITEM_SPACER``
+terminator, for both the default layout and the Orange County layout.
+"""
+import calendar
+import json
+import random
+
+DEFAULT_ROW = '@CAD_LBL" scope="row">{label}@G@F tabindex="0" @{cls}">{value}@G'
+# The city/zip line has no label cell of its own.
+DEFAULT_CITY_ROW = '@CAD_LBL" scope="row">@F tabindex="0" @CAD_DTA">{city}, FL- {zip}@G'
+ORANGE_ROW = '@CAD_LBL">{label}@B<div tabindex="0"@{cls}">{value}@B'
+
+CITIES = [
+    ("SANFORD", "32771"), ("OVIEDO", "32765"), ("LONGWOOD", "32750"),
+    ("ORLANDO", "32801"), ("WINTER PARK", "32789"), ("APOPKA", "32703"),
+]
+STREETS = ["MAIN ST", "OAK AVE", "LAKE DR", "PINE CT", "ORANGE BLVD", "CEDAR LN"]
+AUCTION_TYPES = ["FORECLOSURE", "TAXDEED"]
+
+
+def _money(rnd, low, high):
+    return f"${rnd.uniform(low, high):,.2f}"
+
+
+def _item_fields(rnd, auction_id):
+    city, zip_code = rnd.choice(CITIES)
+    return {
+        "auction_type": rnd.choice(AUCTION_TYPES),
+        "case_number": f'<a href="/index.cfm?zaction=AUCTION&amp;ZMETHOD=CASE&amp;ID={auction_id}">2024-CA-{auction_id:06d}</a>',
+        "final_judgment_amount": _money(rnd, 20000, 400000),
+        "parcel_id": f'<a href="https://www.pa.example/parcel/{auction_id}" target="_blank">{auction_id:02d}-21-30-5{auction_id % 10}0-0000-0{auction_id % 97:03d}</a>',
+        "street": f"{rnd.randint(100, 9999)} {rnd.choice(STREETS)}",
+        "city": city,
+        "zip": zip_code,
+        "assessed_value": _money(rnd, 50000, 500000),
+        "plaintiff_max_bid": rnd.choice(["Hidden", _money(rnd, 10000, 300000)]),
+        # Some items (timeshares, cancelled sales) come without an address
+        # or without a plaintiff bid; keep a few of those in the mix.
+        "has_address": rnd.random() > 0.05,
+        "has_max_bid": rnd.random() > 0.1,
+    }
+
+
+def default_item(rnd, auction_id):
+    f = _item_fields(rnd, auction_id)
+    rows = [
+        DEFAULT_ROW.format(label="Auction Type:", cls="CAD_DTA", value=f["auction_type"]),
+        DEFAULT_ROW.format(label="Case #:", cls="CAD_DTA", value=f["case_number"]),
+        DEFAULT_ROW.format(label="Final Judgment Amount:", cls="CAD_DTA", value=f["final_judgment_amount"]),
+        DEFAULT_ROW.format(label="Parcel ID:", cls="CAD_DTA", value=f["parcel_id"]),
+    ]
+    if f["has_address"]:
+        rows.append(DEFAULT_ROW.format(label="Property Address:", cls="CAD_DTA", value=f["street"]))
+        rows.append(DEFAULT_CITY_ROW.format(city=f["city"], zip=f["zip"]))
+    rows.append(DEFAULT_ROW.format(label="Assessed Value:", cls="CAD_DTA", value=f["assessed_value"]))
+    if f["has_max_bid"]:
+        rows.append(DEFAULT_ROW.format(label="Plaintiff Max Bid:", cls="CAD_DTA ASTAT_MSGPB", value=f["plaintiff_max_bid"]))
+    return (
+        f'<div id="AITEM_{auction_id}" class="AUCTION_ITEM PREVIEW" aid="{auction_id}">'
+        '@AAUCTION_STATS">@AASTAT_MSGA ASTAT_LBL">Auction Starts@BASTAT_MSGB Astat_DATA">10:00 AM ET@B@B'
+        '@AAUCTION_DETAILS"><table class="ad_tab" tabindex="0">'
+        + "".join(f"<tr><th {row}</tr>" for row in rows)
+        + '</table>@B@B<div class="@E_ITEM_SPACER">&nbsp;</div>'
+    )
+
+
+def orange_item(rnd, auction_id):
+    f = _item_fields(rnd, auction_id)
+    rows = [
+        ORANGE_ROW.format(label="Case #:", cls="AAD_DTA", value=f["case_number"]),
+        ORANGE_ROW.format(label="Final Judgment Amount:", cls="CAD_DTA", value=f["final_judgment_amount"]),
+        ORANGE_ROW.format(label="Parcel ID:", cls="AAD_DTA", value=f["parcel_id"]),
+    ]
+    if f["has_address"]:
+        rows.append(ORANGE_ROW.format(label="Property Address:", cls="CAD_DTA", value=f["street"]))
+        rows.append(ORANGE_ROW.format(label="", cls="CAD_DTA", value=f"{f['city']}, {f['zip']}"))
+    rows.append(ORANGE_ROW.format(label="Assessed Value:", cls="CAD_DTA", value=f["assessed_value"]))
+    if f["has_max_bid"]:
+        rows.append(ORANGE_ROW.format(label="Plaintiff Max Bid:", cls="CAD_DTA ASTAT_MSGPB", value=f["plaintiff_max_bid"]))
+    return (
+        f'<div id="AITEM_{auction_id}" class="AUCTION_ITEM PREVIEW" aid="{auction_id}">'
+        '@AAUCTION_STATS">@AASTAT_MSGA ASTAT_LBL">Auction Starts@BASTAT_MSGB Astat_DATA">11:00 AM ET@B@B'
+        '@AAUCTION_DETAILS">' + "".join(rows) + '@B@B<div class="@E_ITEM_SPACER">&nbsp;</div>'
+    )
+
+
+def auction_payload(count, county="default", seed=0, first_id=100000):
+    """Return an AJAX response body with ``count`` items as a JSON string."""
+    rnd = random.Random(seed)
+    make_item = orange_item if county.lower() == "orange" else default_item
+    ids = list(range(first_id, first_id + count))
+    html = "".join(make_item(rnd, auction_id) for auction_id in ids)
+    return json.dumps({"retHTML": html, "rlist": ",".join(str(i) for i in ids)})
+
+
+def auction_datasets(count, counties=("SEMINOLE", "ORANGE"), items_per_date=50, seed=0):
+    """Return (county, data) pairs, shaped like AuctionStore.iter_data, with ``count`` items in total."""
+    rnd = random.Random(seed)
+    datasets = []
+    auction_id = 100000
+    day = 0
+    while auction_id < 100000 + count:
+        county = counties[day % len(counties)]
+        month, mday = divmod(day // len(counties), 28)
+        date = f"{month % 12 + 1:02d}/{mday + 1:02d}/{2020 + month // 12}"
+        items = []
+        for _ in range(min(items_per_date, 100000 + count - auction_id)):
+            f = _item_fields(rnd, auction_id)
+            items.append({
+                "auction_id": str(auction_id),
+                "auction_type": f["auction_type"],
+                "case_number": f"2024-CA-{auction_id:06d}",
+                "final_judgment_amount": f["final_judgment_amount"],
+                "parcel_id": f"{auction_id:02d}-21-30-5{auction_id % 10}0-0000-0{auction_id % 97:03d}",
+                "property_address": f"{f['street']}, {f['city']}, FL-{f['zip']}" if f["has_address"] else "",
+                "assessed_value": f["assessed_value"] if rnd.random() > 0.02 else "",
+                "plaintiff_max_bid": f["plaintiff_max_bid"] if f["has_max_bid"] else "",
+                "realtor_link": None,
+            })
+            auction_id += 1
+        datasets.append((county, {
+            "url": f"https://{county.lower()}.example/index.cfm?zaction=AUCTION&Zmethod=PREVIEW&AUCTIONDATE={date}",
+            "auction_date": date,
+            "scrape_date": "2026-01-01 00:00:00",
+            "auction_items": items,
+        }))
+        day += 1
+    return datasets
+
+
+CALENDAR_PAGE = (
+    '<!DOCTYPE html><html><head><title>Auction Calendar</title>'
+    '<link rel="stylesheet" href="/css/site.css"><script src="/js/jquery.min.js"></script>'
+    '<script>var CALENDAR_ID = "{month}"; var AUCTION_TYPES = ["FORECLOSURE", "TAXDEED"];</script></head>'
+    '<body><div id="Header"><div class="HEADER_LOGO"></div>{menu}</div>'
+    '<div class="CALHEADER"><div class="CALTEXT">{title}</div></div>'
+    '<div class="CALDAYBOX">{days}</div>'
+    '<div id="Footer">{footer}</div></body></html>'
+)
+CALENDAR_DAY = (
+    '<div class="CALBOX CALW5 {state}" role="link" tabindex="0" dayid="{dayid}" '
+    'aria-label="{label}"><span class="CALNUM">{day}</span>{message}</div>'
+)
+
+
+def calendar_html(year, month, seed=0, active_share=0.4):
+    """Return a calendar page with about ``active_share`` of the weekdays holding auctions."""
+    rnd = random.Random(seed * 100 + month)
+    days = []
+    for week in calendar.Calendar(firstweekday=6).monthdayscalendar(year, month):
+        for weekday, day in enumerate(week):
+            if day == 0:
+                days.append('<div class="CALBOX CALW5 CALBLANK"></div>')
+                continue
+            dayid = f"{month:02d}/{day:02d}/{year}"
+            active = 0 < weekday < 6 and rnd.random() < active_share
+            if active:
+                message = (f'<span class="CALMSG"><span class="CALACT">{rnd.randint(1, 60)}</span>'
+                           f'<span class="CALTEXT"> FC</span></span>')
+            else:
+                message = '<span class="CALMSG"><span class="CALTEXT">No auctions</span></span>'
+            days.append(CALENDAR_DAY.format(state="CALSELF" if active else "CALNONE", dayid=dayid,
+                                            label=f"{dayid} auctions", day=day, message=message))
+    menu = "".join(f'<a class="MENU_ITEM" href="/index.cfm?zaction=MENU&amp;id={i}">Item {i}</a>' for i in range(40))
+    footer = "".join(f'<p class="FOOTER_TEXT">Notice {i}: sales are final.</p>' for i in range(30))
+    return CALENDAR_PAGE.format(month=f"{month:02d}/01/{year}", menu=menu, title=f"{month:02d}/{year}",
+                                days="".join(days), footer=footer)
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""Offline benchmark suite: parse, calendar, filter, store and export throughput plus peak memory,
+and the startup (import) time of the CLIs.
+
+Everything runs on the synthetic fixtures (and, with --payloads, on recorded
+AJAX responses), so results only depend on the code. Each run is written to
+bench/results/<commit>.json; compare two runs with --compare.
+
+Usage:
+    python -m bench.run [--items 40000] [--items-per-date 25] [--payload-items 500] [--export-rows 100000] [--repeat 3]
+    python -m bench.run --compare bench/results/OLD.json bench/results/NEW.json
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from bench.fixtures import auction_datasets, auction_payload, calendar_html
+from lib.fc_calendar import CalendarScrapper
+from lib.filter_data import FilterData
+from lib.export import WRITERS, export_frame
+from lib.filter_engine import FilterEngine
+from lib.parse_data import ParseData
+from lib.store import AuctionStore
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLIS = ("fc.py", "filter.py", "enrich.py")
+RULES = {"min": 130000, "max": 180000}
+
+
+def measure(func, repeat):
+    """Best time of `repeat` runs, then one more run under tracemalloc for the peak memory."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(timings), peak
+
+
+def result(seconds, peak, units, unit):
+    return {
+        "seconds": seconds,
+        "units": units,
+        "unit": unit,
+        "per_second": units / seconds if seconds else 0.0,
+        "peak_bytes": peak,
+    }
+
+
+def parse_benchmarks(payload_items, repeat, payloads_dir=None):
+    results = {}
+    payloads = [(f"parse_{county}", county, auction_payload(payload_items, county, seed=1))
+                for county in ("default", "orange")]
+    for path in sorted(glob.glob(os.path.join(payloads_dir, "*.json"))) if payloads_dir else []:
+        # Recorded responses are named <county>_<anything>.json
+        county = os.path.basename(path).split("_")[0]
+        with open(path) as f:
+            payloads.append((f"parse_recorded_{os.path.basename(path)[:-5]}", county, f.read()))
+
+    for name, county, payload in payloads:
+        def parse():
+            parse_data = ParseData()
+            html_content, auction_ids = parse_data.load_payload(payload)
+            return parse_data.parse_records(parse_data.index_items(html_content), auction_ids, county, "10/01/2026")
+        items = len(parse())
+        seconds, peak = measure(parse, repeat)
+        results[name] = result(seconds, peak, items, "items")
+    return results
+
+
+def calendar_benchmark(repeat):
+    pages = [calendar_html(2026, month, seed=month) for month in range(1, 13)]
+    scrapper = CalendarScrapper()
+    dates = sum(len(scrapper.parse_dates(page)) for page in pages)
+    seconds, peak = measure(lambda: [scrapper.parse_dates(page) for page in pages], repeat)
+    return {"calendar_parse": result(seconds, peak, len(pages), "pages") | {"dates": dates}}
+
+
+def filter_benchmarks(datasets, items, repeat):
+    results = {}
+    seconds, peak = measure(lambda: [FilterData().filer(data, **RULES) for _, data in datasets], repeat)
+    results["filter_loop"] = result(seconds, peak, items, "items")
+    seconds, peak = measure(lambda: FilterEngine.from_datasets(datasets), repeat)
+    results["filter_engine_load"] = result(seconds, peak, items, "items")
+    engine = FilterEngine.from_datasets(datasets)
+    seconds, peak = measure(lambda: engine.filter(**FilterEngine.legacy_rules(**RULES)), repeat)
+    results["filter_engine_mask"] = result(seconds, peak, items, "items")
+    return results
+
+
+def store_benchmarks(datasets, items, repeat):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "auctions.sqlite")
+
+        def save():
+            store = AuctionStore(path)
+            for county, data in datasets:
+                store.save(county, data)
+            store.close()
+
+        def load():
+            store = AuctionStore(path)
+            loaded = sum(len(data["auction_items"]) for _, data in store.iter_data())
+            store.close()
+            return loaded
+
+        seconds, peak = measure(save, repeat)
+        results["store_save"] = result(seconds, peak, items, "items")
+        seconds, peak = measure(load, repeat)
+        results["store_load"] = result(seconds, peak, items, "items")
+        seconds, peak = measure(lambda: FilterEngine.from_store(path), repeat)
+        results["store_frame"] = result(seconds, peak, items, "items")
+        results["store_size"] = {"bytes": os.path.getsize(path), "units": items, "unit": "items"}
+    return results
+
+
+def export_benchmarks(rows, repeat, legacy=False):
+    """Write `rows` filtered rows with every writer; about half of them have a realtor_link"""
+    results = {}
+    frame = FilterEngine.from_datasets(auction_datasets(rows, items_per_date=100)).frame
+    frame.loc[frame.index[::2], "realtor_link"] = "https://www.realtor.com/realestateandhomes-detail/M1234567890"
+    with tempfile.TemporaryDirectory() as tmp:
+        for extension in WRITERS:
+            path = os.path.join(tmp, f"export{extension}")
+            try:
+                seconds, peak = measure(lambda: export_frame(frame, path), repeat)
+            except ValueError as e:
+                # Optional writer whose library isn't installed
+                print(f"Skipping export{extension}: {e}", file=sys.stderr)
+                continue
+            results[f"export_{extension[1:]}"] = result(seconds, peak, rows, "rows") | {"bytes": os.path.getsize(path)}
+        if legacy:
+            # What FilterData.save_to_excel did before: DataFrame.to_excel through a full openpyxl workbook
+            path = os.path.join(tmp, "legacy.xlsx")
+            columns = ["property_address", "assessed_value", "final_judgment_amount", "auction_date", "realtor_link"]
+            seconds, peak = measure(lambda: frame[columns].to_excel(path, index=False), 1)
+            results["export_xlsx_to_excel"] = result(seconds, peak, rows, "rows") | {"bytes": os.path.getsize(path)}
+    return results
+
+
+def import_times(script):
+    """Cumulative seconds of each top-level import of a CLI (python -X importtime), slowest first"""
+    completed = subprocess.run([sys.executable, "-X", "importtime", script, "--help"], cwd=ROOT,
+                               capture_output=True, text=True)
+    modules = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        # Nested imports are indented by two more spaces per level
+        if cumulative.strip().isdigit() and not name.startswith("  "):
+            modules[name.strip()] = int(cumulative) / 1e6
+    return sorted(modules.items(), key=lambda entry: -entry[1])
+
+
+def startup_benchmarks(repeat):
+    """Wall time of `<cli> --help` (interpreter start plus imports) and where the import time goes"""
+    results = {}
+    for script in CLIS:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, script, "--help"], cwd=ROOT, capture_output=True, check=True)
+            timings.append(time.perf_counter() - start)
+        imports = import_times(script)
+        results[f"startup_{script[:-3]}"] = result(min(timings), None, 1, "runs") | {
+            "import_seconds": sum(seconds for _, seconds in imports),
+            "slowest_imports": imports[:5],
+        }
+    return results
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True,
+                               text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if dirty else commit
+
+
+def run(args):
+    datasets = auction_datasets(args.items, items_per_date=args.items_per_date)
+    first_day = datasets[0][1]["auction_date"]
+    last_day = datasets[-1][1]["auction_date"]
+    print(f"{args.items} items over {len(datasets)} auction dates ({first_day} - {last_day}), "
+          f"{args.payload_items} items per parsed payload")
+
+    benchmarks = {}
+    benchmarks.update(parse_benchmarks(args.payload_items, args.repeat, args.payloads))
+    benchmarks.update(calendar_benchmark(args.repeat))
+    benchmarks.update(filter_benchmarks(datasets, args.items, args.repeat))
+    benchmarks.update(store_benchmarks(datasets, args.items, args.repeat))
+    if args.export_rows:
+        benchmarks.update(export_benchmarks(args.export_rows, args.repeat, args.legacy_export))
+    benchmarks.update(startup_benchmarks(args.repeat))
+    return {
+        "commit": git_commit(),
+        "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "options": {"items": args.items, "items_per_date": args.items_per_date,
+                    "payload_items": args.payload_items, "export_rows": args.export_rows, "repeat": args.repeat},
+        "benchmarks": benchmarks,
+    }
+
+
+def print_results(results):
+    print(f"{'benchmark':<24} {'seconds':>10} {'throughput':>22} {'peak MiB':>9}")
+    for name, bench in results["benchmarks"].items():
+        if "seconds" not in bench:
+            print(f"{name:<24} {'':>10} {bench['bytes'] / bench['units']:>15.0f} B/item")
+            continue
+        if "import_seconds" in bench:
+            print(f"{name:<24} {bench['seconds']:>10.4f} {bench['import_seconds']:>15.4f} s imp")
+            continue
+        throughput = f"{bench['per_second']:,.0f} {bench['unit']}/s"
+        print(f"{name:<24} {bench['seconds']:>10.4f} {throughput:>22} {bench['peak_bytes'] / 2 ** 20:>9.2f}")
+
+
+def compare(old_path, new_path):
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"{old['commit']} ({old['date']}) -> {new['commit']} ({new['date']})")
+    if old["options"] != new["options"]:
+        print(f"Warning: different options {old['options']} vs {new['options']}")
+    print(f"{'benchmark':<24} {'old/s':>14} {'new/s':>14} {'speed':>8} {'peak mem':>9}")
+    for name, bench in new["benchmarks"].items():
+        before = old["benchmarks"].get(name)
+        if before is None or "seconds" not in bench or "seconds" not in before:
+            continue
+        speed = before["seconds"] / bench["seconds"] if bench["seconds"] else float("inf")
+        if bench.get("peak_bytes") is None or before.get("peak_bytes") is None:
+            memory = ""
+        else:
+            memory = f"{bench['peak_bytes'] / before['peak_bytes']:.2f}x" if before["peak_bytes"] else "inf"
+        print(f"{name:<24} {before['per_second']:>14,.0f} {bench['per_second']:>14,.0f} "
+              f"{speed:>7.2f}x {memory:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline benchmark suite')
+    parser.add_argument('--items', type=int, default=40000, help='Items in the filter and store benchmarks')
+    parser.add_argument('--items-per-date', type=int, default=25, help='Items per auction date (more dates = more history)')
+    parser.add_argument('--payload-items', type=int, default=500, help='Items per parsed AJAX payload')
+    parser.add_argument('--export-rows', type=int, default=100000, help='Rows in the export benchmarks (0 to skip them)')
+    parser.add_argument('--legacy-export', action='store_true', help='Also time the old DataFrame.to_excel export (slow)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is kept)')
+    parser.add_argument('--payloads', help='Directory of recorded AJAX responses named <county>_<name>.json')
+    parser.add_argument('--output', help='Results file (default: bench/results/<commit>.json)')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='Compare two results files and exit')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    results = run(args)
+    print_results(results)
+    output = args.output or os.path.join(RESULTS_DIR, f"{results['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=4)
+    print(f"Results saved to {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# add realtor.com links to auction items already saved in the store (or in data/<COUNTY>/*.json with --json)
+# only items without a realtor_link are looked up unless --force is given
+import os
+import argparse
+from lib import http_session
+from lib import match_index
+from lib import suggest_cache
+from lib.enrich import Enricher
+from lib.store import AuctionStore, DEFAULT_PATH
+
+def find_files(path, counties=None):
+    """List the JSON files under path, optionally for some counties only"""
+    paths = []
+    for root, dirs, files in os.walk(path):
+        county = os.path.basename(root)
+        if counties and county.upper() not in counties:
+            continue
+        for file in files:
+            if file.endswith('.json'):
+                paths.append(os.path.join(root, file))
+    return sorted(paths)
+
+def main():
+    parser = argparse.ArgumentParser(description='Enrich saved auction data with realtor.com links')
+    parser.add_argument('--json', action='store_true', help='Enrich the JSON files under --path instead of the store')
+    parser.add_argument('--path', default='./data', help='Directory with the saved JSON files')
+    parser.add_argument('--store', default=DEFAULT_PATH, help='SQLite store')
+    parser.add_argument('--county', action='append', help='Only enrich this county (can be repeated)')
+    parser.add_argument('--force', action='store_true', help='Look up items that already have a link again')
+    parser.add_argument('--workers', type=int, default=8, help='Concurrent realtor.com lookups')
+    parser.add_argument('--index', default=match_index.DEFAULT_PATH, help='Match index of known links by parcel ID and address')
+    parser.add_argument('--rebuild-index', action='store_true', help='Fill the match index from the store and the realtor cache again')
+    parser.add_argument('--record', metavar='ARCHIVE', help='Save every HTTP response to this replay archive')
+    parser.add_argument('--replay', metavar='URL', help='Send every HTTP request to a replay server (python replay.py serve)')
+    args = parser.parse_args()
+    if args.record or args.replay:
+        http_session.configure(record=args.record, replay=args.replay)
+
+    counties = {county.upper() for county in args.county} if args.county else None
+    store = AuctionStore(args.store)
+    index = match_index.configure(args.index, store=store, cache=suggest_cache.get_cache())
+    if args.rebuild_index:
+        print(f"Added {index.build(store, suggest_cache.get_cache())} known links to the match index")
+    enricher = Enricher(workers=args.workers)
+    if args.json:
+        paths = find_files(args.path, counties)
+        print(f"Found {len(paths)} files")
+        rewritten = enricher.enrich_files(paths, force=args.force)
+        print(f"Updated {rewritten} files with {enricher.lookups} address lookups ({enricher.failures} failed, retried next run)")
+    else:
+        keys = [(county, date) for county, date in store.dates()
+                if not counties or county.upper() in counties]
+        print(f"Found {len(keys)} auction dates")
+        updated = enricher.enrich_store(store, keys, force=args.force)
+        print(f"Updated {updated} auction dates with {enricher.lookups} address lookups ({enricher.failures} failed, retried next run)")
+    print(suggest_cache.get_cache().summary())
+    print(index.summary())
+
+if __name__ == "__main__":
+    main()
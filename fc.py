@@ -3,26 +3,36 @@ import os
 import json
 from datetime import datetime
 import argparse
-from requests_html import HTMLSession
 import requests
-from bs4 import BeautifulSoup
 import sys
+import time
+from lib import counties as county_config
+from lib import http_session
+from lib import job_queue
+from lib import match_index
+from lib import metrics
+from lib import suggest_cache
+from lib import scrape_state
+from lib import store
+from lib.crawler import Crawler
+from lib.fc_calendar import CalendarScrapper, months_between, parse_bound
 from lib.fc_listing import ListingScrapper
 from lib.parse_data import ParseData
+from lib.rate_limit import RateLimiter
 
-COUNTIES = {
-    #"POLK": "https://polk.realforeclose.com",
-    "SEMINOLE": "https://seminole.realforeclose.com",
-    #"MARION": "https://www.marion.realforeclose.com",
-    #"VOLUSIA": "https://www.volusia.realforeclose.com",
-    "ORANGE": "https://www.myorangeclerk.realforeclose.com"
-}
+COUNTIES = county_config.get_registry().base_urls() # Enabled counties from counties.json (name -> base URL)
 
 CURRENT_COUNTY = None
 BASE_URL = None
 SESSION = None
 NEXT_MNTH = False  # Global variable to store the --next flag value
 FORCE = False # Global variable to store the --force flag value
+PARALLEL = False # Global variable to store the --parallel flag value
+INCREMENTAL = False # Global variable to store the --incremental flag value
+SKIP_UNCHANGED = False # Global variable to store the --skip-unchanged-calendars flag value
+LISTING_SCRAPPER = ListingScrapper() # Shared so render fallbacks and timings add up over the run
+WRITE_JSON = False # Global variable to store the --json flag value
+SAVED_DATES = [] # (county, date) saved during the run, enriched once scraping is done
 
 def prompt_for_county():
     global CURRENT_COUNTY
@@ -51,69 +61,132 @@ def prompt_for_county():
         except ValueError:
             print("Please enter a valid number.")
 
-def scrape_foreclosure_dates(url):
-    """Scrape foreclosure dates from the provided URL."""
+def scrape_foreclosure_dates(url, county=None):
+    """Scrape foreclosure dates from the provided URL; returns (dates, calendar unchanged since the last run)."""
     try:
         global SESSION
-        SESSION = HTMLSession()
-        # Send request to the website
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = SESSION.get(url, headers=headers)
-        response.raise_for_status()
-        # Parse the HTML content
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Find the dates in the calendar
-        # This selector might need adjustment based on the actual structure of the website
-        calendar_dates = []
-        calendar_root = soup.select_one('div.CALDAYBOX')
-        # Look for date elements (typically in a calendar view)
-        caldaybox_elements = calendar_root.select('div.CALBOX')
-        if caldaybox_elements:
-            for element in caldaybox_elements:
-                # Extract the dayid attribute from the div
-                day_id = element.get('dayid')
-                active = element.select_one('span.CALMSG span.CALACT')
-                if day_id and active:
-                    calendar_dates.append(day_id)
-                    
-        return calendar_dates
+        SESSION = http_session.get_session()
+        county = county or CURRENT_COUNTY
+        calendar_scrapper = CalendarScrapper()
+        state = scrape_state.get_state()
+        # Conditional request when the calendar was seen before
+        headers = calendar_scrapper.request_headers(state.get_calendar(county, url))
+        with metrics.timer("calendar"):
+            response = SESSION.get(url, headers=headers)
+        return calendar_scrapper.read_dates(county, url, response, state)
     
     except requests.exceptions.RequestException as e:
         print(f"Error fetching the webpage: {e}", file=sys.stderr)
-        return []
+        return [], False
     except Exception as e:
         print(f"Error during scraping: {e}", file=sys.stderr)
-        return []
+        return [], False
 
-def get_date_specific_url(date):
+def get_date_specific_url(date, base_url=None):
     """
     Generate URL for a specific date.
     """
-    return f"{BASE_URL}/index.cfm?zaction=AUCTION&Zmethod=PREVIEW&AUCTIONDATE={date}"
+    return f"{base_url or BASE_URL}/index.cfm?zaction=AUCTION&Zmethod=PREVIEW&AUCTIONDATE={date}"
 
-def save_data_to_file(date, auction_items, url):
-    # Create data directory if it doesn't exist
-    os.makedirs(f'data/{CURRENT_COUNTY}', exist_ok=True)
-    safe_date = date.replace('/', '_')
-    # Format date for filename
-    filename = f"data/{CURRENT_COUNTY}/{safe_date}.json"
+def get_data_filename(date, county=None):
+    return f"data/{county or CURRENT_COUNTY}/{date.replace('/', '_')}.json"
 
+def save_data(date, records, url, county=None):
+    county = county or CURRENT_COUNTY
     # Create a dictionary with metadata and auction items
     data_to_save = {
         "url": url,
         "auction_date": date,
         "scrape_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "auction_items": auction_items
+        "auction_items": [record.to_dict() for record in records]
     }
-    
-    # Save auction items to file
-    with open(filename, 'w') as f:
-        json.dump(data_to_save, f, indent=4, default=str)
-    
-    print(f"Data saved to {filename}")
+
+    with metrics.timer("save"):
+        store.get_store().save(county, data_to_save)
+    SAVED_DATES.append((county, date))
+    print(f"Data saved for {county} {date}")
+
+    if WRITE_JSON:
+        # Also keep the one-file-per-date JSON tree
+        os.makedirs(f'data/{county}', exist_ok=True)
+        filename = get_data_filename(date, county)
+        with open(filename, 'w') as f:
+            json.dump(data_to_save, f, indent=4, default=str)
+        print(f"Data saved to {filename}")
+
+def needs_date(county, date, calendar_unchanged=False):
+    """
+    Tell whether an auction date still has to be scraped
+
+    --incremental re-checks saved dates; with --skip-unchanged-calendars it
+    leaves out the ones of a month whose calendar is the same as on the last
+    run. --force scrapes everything. A date that had no items is saved as
+    well, so it isn't queued again on every run.
+    """
+    if FORCE or (INCREMENTAL and not (SKIP_UNCHANGED and calendar_unchanged)):
+        return True
+    # JSON files of runs that predate the store count as well
+    if store.get_store().has_date(county, date) or os.path.exists(get_data_filename(date, county)):
+        reason = "calendar unchanged" if INCREMENTAL else "data already exists"
+        print(f"Skipping date {date} - {reason}")
+        return False
+    return True
+
+def load_saved_items(date, county):
+    """Items saved by an earlier run, by auction ID"""
+    data = store.get_store().load(county, date)
+    if data is None:
+        return {}
+    return {item['auction_id']: item for item in data['auction_items']}
+
+def process_auction_day(county, date, url, raw_data, parse_data=None):
+    """Parse and save the raw AJAX payload of one auction date; False when the payload isn't valid"""
+    parse_data = parse_data or ParseData()
+    with metrics.timer("index"):
+        payload = parse_data.load_payload(raw_data)
+        item_index = parse_data.index_items(payload[0]) if payload else {}
+    if payload is None:
+        metrics.incr("invalid_payloads")
+        return False
+    auction_ids = payload[1]
+    state = scrape_state.get_state()
+
+    if INCREMENTAL and not FORCE:
+        previous = state.get(county, date)
+        previous_hashes = previous["item_hashes"] if previous else {}
+        saved_items = load_saved_items(date, county)
+        with metrics.timer("parse"):
+            records, item_hashes, changes = scrape_state.merge_items(
+                parse_data, item_index, auction_ids, county, previous_hashes, saved_items, date)
+        metrics.incr("items_parsed", changes['added'] + changes['changed'])
+        metrics.incr("items_unchanged", changes['unchanged'])
+        print(f"Auction items: [{len(records)}] at [{date}] - "
+              f"{changes['added']} added, {changes['changed']} changed, "
+              f"{changes['removed']} removed, {changes['unchanged']} unchanged")
+        if previous and not (changes['added'] or changes['changed'] or changes['removed']):
+            state.put(county, date, list(item_hashes.keys()), item_hashes)
+            return True
+    else:
+        with metrics.timer("parse"):
+            records = parse_data.parse_records(item_index, auction_ids, county, date)
+            # Everything is parsed again, but the links found by earlier runs are kept
+            saved_items = load_saved_items(date, county)
+            for record in records:
+                scrape_state.keep_realtor_link(record, saved_items.get(record.auction_id))
+            item_hashes = {record.auction_id: scrape_state.item_hash(item_index[record.auction_id])
+                           for record in records}
+        metrics.incr("items_parsed", len(records))
+        print(f"Auction items: [{len(records)}] at [{date}]")
+
+    if records:
+        print("-" * 50)
+        print(f"URL: {url}")
+        parse_data.display_auction_items(records)
+    # Saved even when empty, so items that left the date don't outlive it
+    save_data(date, records, url, county)
+    # Recorded once the items are saved, so a crash never hides a change
+    state.put(county, date, list(item_hashes.keys()), item_hashes)
+    return True
 
 def process_county(county=None):
     global CURRENT_COUNTY, BASE_URL, SESSION, NEXT_MNTH, FORCE
@@ -122,65 +195,89 @@ def process_county(county=None):
         CURRENT_COUNTY = county
         BASE_URL = COUNTIES[county]
         SESSION = None
-    # Get the current date and calculate next month's date if NEXTMNT is True
-    if NEXT_MNTH:
-        # Import required modules for date manipulation
-        from datetime import datetime, timedelta
-        from dateutil.relativedelta import relativedelta
-        # Get current date
-        current_date = datetime.now()
-        # Add one month to get next month
-        next_month_date = current_date + relativedelta(months=1)
-        # Format the date as MM/01/YYYY (first day of next month)
-        formatted_date = next_month_date.strftime("%m/01/%Y")
-        # Generate URL with the next month's date
-        #/index.cfm?zaction=user&zmethod=calendar&selCalDate=04/01/2025
-        url = f"{BASE_URL}/index.cfm?zaction=USER&zmethod=CALENDAR&selCalDate={formatted_date}"
-    else:
-        # Use the default URL (current month)
-        url = f"{BASE_URL}/index.cfm?zaction=USER&zmethod=CALENDAR"
-    
-    #url = f"{BASE_URL}/index.cfm?zaction=USER&zmethod=CALENDAR"
-    print(f"URL: {url}")
+    # Get the current month's calendar, or next month's if NEXT_MNTH is True
+    calendar_url = CalendarScrapper().get_calendar_url(BASE_URL, NEXT_MNTH)
+    print(f"URL: {calendar_url}")
     parse_data = ParseData()
-    listing_scrapper = ListingScrapper()
-    dates = scrape_foreclosure_dates(url)
+    profile = county_config.get_profile(CURRENT_COUNTY)
+    dates, unchanged = scrape_foreclosure_dates(calendar_url)
+    if unchanged:
+        print("Calendar unchanged since the last run")
 
+    handled = True
     if dates:
         for date in dates:
             # Check if file already exists for this date
-            filename = f"data/{CURRENT_COUNTY}/{date.replace('/', '_')}.json"
-            if os.path.exists(filename) and not FORCE:
-                print(f"Skipping date {date} - data already exists")
+            if not needs_date(CURRENT_COUNTY, date, unchanged):
                 continue
             url = get_date_specific_url(date)
-            raw_data = listing_scrapper.get_data_specific_url(url, BASE_URL, SESSION)
-            auction_items = parse_data.parse_auction_data(raw_data, CURRENT_COUNTY)
-            print(f"Auction items: [{len(auction_items)}] at [{date}]")
-            # filter from json database
-            auction_items = parse_data.enrich_auction_items(auction_items)
-            if auction_items:
-                print("-" * 50)
-                print(f"URL: {url}")
-                parse_data.display_auction_items(auction_items)
-                save_data_to_file(date, auction_items, url)
+            raw_data = LISTING_SCRAPPER.get_data_specific_url(url, BASE_URL, SESSION)
+            if not process_auction_day(CURRENT_COUNTY, date, url, raw_data, parse_data):
+                handled = False
+            if profile.delay:
+                time.sleep(profile.delay)
     else:
         print(f"No dates found for {CURRENT_COUNTY}.")
+    if handled:
+        # Only now is the calendar remembered as seen
+        scrape_state.get_state().commit_calendar(CURRENT_COUNTY, calendar_url)
 
-def main():
-    global NEXT_MNTH, FORCE
-    # Set up argument parser
-    parser = argparse.ArgumentParser(description='Foreclosure data scraper')
-    parser.add_argument('--next', action='store_true', help='Flag for next month processing')
-    parser.add_argument('--force', action='store_true', help='Force processing even if data already exists')
-    args = parser.parse_args()
-    # Store the --next flag value in the global variable
-    NEXT_MNTH = args.next
-    FORCE = args.force
+def process_counties_parallel(counties, max_concurrency=8, per_host=2):
+    """Crawl several counties at once with the asyncio crawler"""
+    calendar_scrapper = CalendarScrapper()
+    crawler = Crawler(max_concurrency=max_concurrency, per_host=per_host, listing_scrapper=LISTING_SCRAPPER)
+    crawler.run(
+        {county: COUNTIES[county] for county in counties},
+        calendar_url=lambda base_url: calendar_scrapper.get_calendar_url(base_url, NEXT_MNTH),
+        day_url=lambda base_url, date: get_date_specific_url(date, base_url),
+        should_fetch=needs_date,
+        handle_day=process_auction_day,
+    )
+
+def in_date_range(date, date_range):
+    """Tell whether an auction date (MM/DD/YYYY) is within (first, last), None meaning any date"""
+    if date_range is None:
+        return True
+    try:
+        day = datetime.strptime(date, "%m/%d/%Y").date()
+    except ValueError:
+        print(f"Skipping date {date} - not a MM/DD/YYYY date", file=sys.stderr)
+        return False
+    return date_range[0] <= day <= date_range[1]
 
+def process_batch(counties, months, queue_path=job_queue.DEFAULT_PATH, max_concurrency=8, per_host=2, max_attempts=3,
+                  date_range=None):
+    """Queue every auction date of the counties and months (within date_range), then work through the queue"""
+    calendar_scrapper = CalendarScrapper()
+    crawler = Crawler(max_concurrency=max_concurrency, per_host=per_host, listing_scrapper=LISTING_SCRAPPER)
+    queue = job_queue.JobQueue(queue_path)
+    try:
+        crawler.run_queue(
+            queue,
+            {county: COUNTIES[county] for county in counties},
+            calendar_urls=lambda base_url: [calendar_scrapper.get_calendar_url(base_url, NEXT_MNTH, month)
+                                            for month in months or [None]],
+            day_url=lambda base_url, date: get_date_specific_url(date, base_url),
+            should_fetch=lambda county, date, unchanged: (in_date_range(date, date_range)
+                                                         and needs_date(county, date, unchanged)),
+            handle_day=process_auction_day,
+            max_attempts=max_attempts,
+        )
+        print(queue.summary())
+        for county, date, attempts, error in queue.failures():
+            print(f"Failed {county} {date} after {attempts} attempts: {error}", file=sys.stderr)
+    finally:
+        queue.close()
+
+def process_interactive(args):
+    """Ask for the county and scrape it (or ALL of them)"""
     process_all = prompt_for_county()
     
-    if process_all:
+    if PARALLEL:
+        counties = list(COUNTIES.keys()) if process_all else [CURRENT_COUNTY]
+        print(f"Processing {', '.join(counties)} in parallel...")
+        process_counties_parallel(counties, args.max_concurrency, args.per_host)
+    elif process_all:
         print("Processing ALL counties...")
         for county in COUNTIES.keys():
             print(f"\n{'=' * 30}")
@@ -191,5 +288,124 @@ def main():
         # Process only the selected county
         process_county()
 
+def main():
+    global NEXT_MNTH, FORCE, PARALLEL, INCREMENTAL, SKIP_UNCHANGED, WRITE_JSON, COUNTIES
+    # Set up argument parser
+    parser = argparse.ArgumentParser(description='Foreclosure data scraper')
+    parser.add_argument('--next', action='store_true', help='Flag for next month processing')
+    parser.add_argument('--force', action='store_true', help='Force processing even if data already exists')
+    parser.add_argument('--incremental', action='store_true', help='Re-check saved dates and only re-parse added or changed items')
+    parser.add_argument('--skip-unchanged-calendars', action='store_true',
+                        help="With --incremental, don't re-check the saved dates of a month whose calendar is unchanged")
+    parser.add_argument('--json', action='store_true', help='Also write data/<COUNTY>/<date>.json files')
+    parser.add_argument('--parallel', action='store_true', help='Crawl counties and auction dates concurrently')
+    parser.add_argument('--max-concurrency', type=int, default=8, help='Maximum requests in flight with --parallel')
+    parser.add_argument('--per-host', type=int, default=2, help='Maximum requests in flight per host with --parallel')
+    parser.add_argument('--always-render', action='store_true', help='Render every auction page instead of rendering only as a fallback')
+    parser.add_argument('--timeout', type=float, default=30, help='Read timeout in seconds for every HTTP request')
+    parser.add_argument('--connect-timeout', type=float, default=10, help='Connect timeout in seconds for every HTTP request')
+    parser.add_argument('--retries', type=int, default=3, help='Retries on connection errors and 429/5xx responses')
+    parser.add_argument('--pool-size', type=int, default=4, help='Keep-alive connections per host')
+    parser.add_argument('--rate', type=float, default=4, help='Starting requests per second per host (adapts to the responses)')
+    parser.add_argument('--max-rate', type=float, default=20, help='Highest requests per second per host')
+    parser.add_argument('--no-rate-limit', action='store_true', help='Send requests without pacing them')
+    parser.add_argument('--cache-ttl', type=float, default=30, help='Days a cached realtor.com link stays valid')
+    parser.add_argument('--negative-cache-ttl', type=float, default=7, help='Days a cached "no match" stays valid')
+    parser.add_argument('--cache-size', type=int, default=100000, help='Maximum number of cached addresses')
+    parser.add_argument('--no-enrich', action='store_true', help='Skip the realtor.com stage (run enrich.py later)')
+    parser.add_argument('--enrich-workers', type=int, default=8, help='Concurrent realtor.com lookups')
+    parser.add_argument('--counties', help='County config file (default: counties.json)')
+    parser.add_argument('--batch', action='store_true', help='Run unattended through the job queue (no prompt)')
+    parser.add_argument('--county', action='append', help='County for --batch (can be repeated, default: every enabled county)')
+    parser.add_argument('--month', action='append', help='Month for --batch as YYYY-MM (can be repeated, default: current or --next)')
+    parser.add_argument('--from', dest='date_from', help='First month (YYYY-MM) or day (YYYY-MM-DD) to crawl (default: the start of the --to month), implies --batch')
+    parser.add_argument('--to', dest='date_to', help='Last month (YYYY-MM) or day (YYYY-MM-DD) to crawl (default: current month, or the --from month if later), implies --batch')
+    parser.add_argument('--queue', default=job_queue.DEFAULT_PATH, help='Job queue for --batch')
+    parser.add_argument('--max-attempts', type=int, default=3, help='Attempts per auction date in --batch, counting those of earlier runs')
+    parser.add_argument('--record', metavar='ARCHIVE', help='Save every HTTP response to this replay archive')
+    parser.add_argument('--replay', metavar='URL', help='Send every HTTP request to a replay server (python replay.py serve)')
+    parser.add_argument('--metrics-json', help='Write the run metrics to this JSON file')
+    parser.add_argument('--metrics-prom', help='Write the run metrics to this Prometheus textfile (.prom)')
+    parser.add_argument('--profile-parser', metavar='PATH', help='Run the parser under cProfile and save the stats to PATH')
+    args = parser.parse_args()
+    metrics.configure(profile_stages=("index", "parse") if args.profile_parser else ())
+    if args.counties:
+        COUNTIES = county_config.configure(args.counties).base_urls()
+    # Store the --next flag value in the global variable
+    NEXT_MNTH = args.next
+    FORCE = args.force
+    PARALLEL = args.parallel
+    INCREMENTAL = args.incremental
+    SKIP_UNCHANGED = args.skip_unchanged_calendars
+    WRITE_JSON = args.json
+    LISTING_SCRAPPER.fast = not args.always_render
+    rate_limiter = False if args.no_rate_limit else RateLimiter(
+        rate=args.rate, max_rate=args.max_rate, host_rates=county_config.get_registry().host_rates())
+    http_session.configure(pool_maxsize=max(args.pool_size, args.per_host), retries=args.retries,
+                           timeout=(args.connect_timeout, args.timeout), rate_limiter=rate_limiter,
+                           record=args.record, replay=args.replay)
+    suggest_cache.configure(ttl=args.cache_ttl * suggest_cache.DAY, negative_ttl=args.negative_cache_ttl * suggest_cache.DAY,
+                            max_entries=args.cache_size)
+
+    date_range = None
+    if args.date_from or args.date_to:
+        try:
+            today = datetime.now().date()
+            last = parse_bound(args.date_to, end=True) if args.date_to else None
+            # Without --from, from the start of the --to month
+            first = parse_bound(args.date_from) if args.date_from else last.replace(day=1)
+            if last is None:
+                # Without --to, up to the current month, or the --from month when that is later
+                last = max(parse_bound(first.strftime("%Y-%m"), end=True), parse_bound(today.strftime("%Y-%m"), end=True))
+        except ValueError:
+            parser.error("--from and --to must be YYYY-MM or YYYY-MM-DD")
+        if first > last:
+            parser.error("--from must not be after --to")
+        if args.month:
+            parser.error("--month can't be combined with --from/--to")
+        date_range = (first, last)
+        args.month = months_between(first, last)
+        args.batch = True
+
+    if args.batch:
+        counties = [county.upper() for county in args.county] if args.county else list(COUNTIES.keys())
+        unknown = [county for county in counties if county not in COUNTIES]
+        if unknown:
+            parser.error(f"Unknown or disabled county: {', '.join(unknown)}")
+        for month in args.month or []:
+            try:
+                datetime.strptime(month, "%Y-%m")
+            except ValueError:
+                parser.error(f"--month must be YYYY-MM, got {month}")
+        print(f"Processing {', '.join(counties)} in batch mode...")
+        process_batch(counties, args.month, args.queue, args.max_concurrency, args.per_host, args.max_attempts,
+                      date_range)
+    else:
+        process_interactive(args)
+
+    if SAVED_DATES and not args.no_enrich:
+        print(f"Enriching {len(SAVED_DATES)} auction dates with realtor.com links...")
+        # A new index starts out with every link found so far
+        match_index.configure(store=store.get_store(), cache=suggest_cache.get_cache())
+        from lib.enrich import Enricher
+        Enricher(workers=args.enrich_workers).enrich_store(store.get_store(), SAVED_DATES)
+        if WRITE_JSON:
+            for county, date in SAVED_DATES:
+                store.get_store().export_json_tree('data', county=county, date=date)
+
+    LISTING_SCRAPPER.close()
+    print(LISTING_SCRAPPER.summary())
+    print(http_session.get_factory().summary())
+    print(suggest_cache.get_cache().summary())
+    print(match_index.get_index().summary())
+    run_metrics = metrics.get_metrics()
+    print(run_metrics.summary())
+    if args.metrics_json:
+        run_metrics.write_json(args.metrics_json)
+    if args.metrics_prom:
+        run_metrics.write_prometheus(args.metrics_prom)
+    if args.profile_parser:
+        print(run_metrics.write_profile(args.profile_parser))
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,38 +1,104 @@
-# scan all json files in data directory and subdirectories
-# filter items by given parameters (e.g. assessed value > judgment value, assessed value in bewtwwen 80k and 120k)
-# create a new json file with filtered items
+# filter the auction items in the store (data/auctions.sqlite)
+# by given parameters (e.g. assessed value > judgment value, assessed value in bewtwwen 80k and 120k)
+# create a new excel file with filtered items
+# JSON files from older runs can be loaded with: python migrate.py import
+# --stream filters month by month in a process pool and writes rows as they come
+# (--json PATH streams a data/<COUNTY>/<date>.json tree instead of the store)
 import os
-import json
-from lib.filter_data import FilterData
-
-# path to directory with json files
-path = "./data"
-# list of filtered items
-filtered_items = []
-
-# walk through directory and subdirectories
-for root, dirs, files in os.walk(path):
-    # loop through files
-    for file in files:
-        # only process json files
-        if file.endswith('.json'):
-            try:
-                file_path = os.path.join(root, file)
-                # open file
-                with open(file_path) as f:
-                    # load json
-                    data = json.load(f)
-                    # check if data has auction_items
-                    if isinstance(data, dict) and 'auction_items' in data:
-                         filtered_items.append(FilterData().filer(data, min = 130000, max = 180000))
-
-            except PermissionError:
-                print(f"Permission denied: {file_path}")
-            except json.JSONDecodeError:
-                print(f"Invalid JSON in file: {file_path}")
-            except Exception as e:
-                print(f"Error processing {file_path}: {str(e)}")
-
-#print(len(filtered_items))
-
-FilterData().save_to_excel(filtered_items)
+import sys
+import argparse
+import datetime
+from lib.fc_calendar import parse_bound
+from lib.store import DEFAULT_PATH
+
+def main():
+    parser = argparse.ArgumentParser(description='Filter stored auction items')
+    parser.add_argument('--store', default=DEFAULT_PATH, help='SQLite store')
+    parser.add_argument('--min', type=float, default=130000, help='Assessed value must be above this')
+    parser.add_argument('--max', type=float, default=180000, help='Assessed value and judgment must be below this')
+    parser.add_argument('--max-judgment', type=float, help='Judgment must be below this (defaults to --max)')
+    parser.add_argument('--any-judgment', action='store_true', help='Keep items whose judgment exceeds the assessed value')
+    parser.add_argument('--min-equity-ratio', type=float, help='Minimum (assessed - judgment) / assessed, e.g. 0.3')
+    parser.add_argument('--county', action='append', help='Only this county (can be repeated)')
+    parser.add_argument('--from', dest='date_from', help='First auction day, YYYY-MM-DD (or YYYY-MM)')
+    parser.add_argument('--to', dest='date_to', help='Last auction day, YYYY-MM-DD (or YYYY-MM)')
+    parser.add_argument('--auction-type', action='append', help='Only this auction type, e.g. FORECLOSURE (can be repeated)')
+    parser.add_argument('--stream', action='store_true', help='Filter in a process pool and write rows as they come (bounded memory)')
+    parser.add_argument('--json', metavar='PATH', help='Stream a data/<COUNTY>/<date>.json tree instead of the store (implies --stream)')
+    parser.add_argument('--workers', type=int, help='Worker processes for --stream (default: CPU count)')
+    parser.add_argument('--output', help='Output file, .xlsx, .csv or .parquet (default: filtered_<timestamp>.xlsx)')
+    args = parser.parse_args()
+    if args.output:
+        from lib.export import WRITERS
+        if os.path.splitext(args.output)[1].lower() not in WRITERS:
+            parser.error(f"--output must end in one of {', '.join(WRITERS)}")
+    try:
+        # A month means its first day for --from and its last for --to
+        if args.date_from:
+            args.date_from = parse_bound(args.date_from).isoformat()
+        if args.date_to:
+            args.date_to = parse_bound(args.date_to, end=True).isoformat()
+    except ValueError:
+        parser.error("--from and --to must be YYYY-MM or YYYY-MM-DD")
+    if args.date_from and args.date_to and args.date_from > args.date_to:
+        parser.error("--from must not be after --to")
+
+    if not args.json and not os.path.exists(args.store):
+        print(f"No store at {args.store}. Run fc.py, or import JSON files with: python migrate.py import")
+        return
+
+    rules = dict(
+        min_assessed=args.min,
+        max_assessed=args.max,
+        max_judgment=args.max if args.max_judgment is None else args.max_judgment,
+        assessed_over_judgment=not args.any_judgment,
+        min_equity_ratio=args.min_equity_ratio,
+        counties=args.county,
+        date_from=args.date_from,
+        date_to=args.date_to,
+        auction_types=args.auction_type,
+    )
+    if args.stream or args.json:
+        stream(args, rules)
+        return
+
+    # pandas is only imported once there is something to filter
+    from lib.filter_data import FilterData
+    from lib.filter_engine import FilterEngine
+
+    # The rules go into the query, so only the matching items are loaded
+    filtered = FilterEngine.from_store(args.store, **rules).frame
+    print(f"{len(filtered)} items matched")
+    try:
+        FilterData().save_to_excel(filtered, args.output)
+    except ValueError as e:
+        print(f"Error writing {args.output}: {e}", file=sys.stderr)
+
+def stream(args, rules):
+    from lib.export import open_writer
+    from lib.filter_stream import StreamingFilter, json_partitions, store_partitions
+
+    if args.json:
+        partitions = json_partitions(args.json, counties=args.county)
+    else:
+        partitions = store_partitions(args.store, counties=args.county, date_from=args.date_from, date_to=args.date_to)
+    filename = args.output or f"filtered_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+    try:
+        writer = open_writer(filename)
+    except ValueError as e:
+        print(f"Error writing {filename}: {e}", file=sys.stderr)
+        return
+    streaming = StreamingFilter(workers=args.workers)
+    try:
+        streaming.run(partitions, rules, writer)
+    finally:
+        writer.close()
+    print(f"{streaming.matched} of {streaming.scanned} items matched in {len(partitions)} partitions")
+    if streaming.matched:
+        print(f"Filtered data saved to {filename}")
+    else:
+        os.remove(filename)
+        print("No items matched the filter criteria")
+
+if __name__ == "__main__":
+    main()
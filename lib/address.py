@@ -0,0 +1,41 @@
+import re
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+# "FL-32801", "FL 32801", "FL32801", "FL 32801-1234" -> "FL 32801"
+STATE_ZIP_PATTERN = re.compile(r'\b([A-Z]{2})\s*-?\s*(\d{5})(?:-\d{4})?\b')
+PUNCTUATION_PATTERN = re.compile(r'[.,;]')
+UNIT_PATTERN = re.compile(r'(?:#|\b(?:APT|APARTMENT|STE|SUITE|UNIT)\b)\s*#?\s*')
+
+# USPS abbreviations of the words that are spelled out differently from source to source
+ADDRESS_WORDS = {
+    "NORTH": "N", "SOUTH": "S", "EAST": "E", "WEST": "W",
+    "NORTHEAST": "NE", "NORTHWEST": "NW", "SOUTHEAST": "SE", "SOUTHWEST": "SW",
+    "STREET": "ST", "AVENUE": "AVE", "AV": "AVE", "ROAD": "RD", "DRIVE": "DR", "BOULEVARD": "BLVD",
+    "LANE": "LN", "COURT": "CT", "CIRCLE": "CIR", "PLACE": "PL", "TERRACE": "TER", "PARKWAY": "PKWY",
+    "HIGHWAY": "HWY", "TRAIL": "TRL", "COVE": "CV", "POINT": "PT", "SQUARE": "SQ",
+}
+
+def normalize_address(address):
+    """Upper-case the address and collapse runs of whitespace"""
+    return WHITESPACE_PATTERN.sub(' ', str(address or '')).strip().upper()
+
+def canonical_address(address):
+    """
+    Matching key of an address: the same property written by different sources gives the same key
+
+    On top of normalize_address, punctuation is dropped, state and zip are
+    written "FL 32801" (the layouts differ: "FL-32801" vs "FL 32801", zip+4),
+    units become "UNIT <n>" and street words get their USPS abbreviation.
+    """
+    address = normalize_address(address)
+    address = STATE_ZIP_PATTERN.sub(r'\1 \2', address)
+    address = PUNCTUATION_PATTERN.sub(' ', address)
+    address = UNIT_PATTERN.sub('UNIT ', address)
+    return ' '.join(ADDRESS_WORDS.get(word, word) for word in address.split())
+
+def canonical_parcel_id(parcel_id):
+    """Matching key of a parcel ID, or None when it doesn't look like one (empty, "MULTIPLE PARCELS")"""
+    parcel_id = WHITESPACE_PATTERN.sub('', str(parcel_id or '')).upper()
+    if not any(char.isdigit() for char in parcel_id):
+        return None
+    return parcel_id
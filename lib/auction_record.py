@@ -0,0 +1,169 @@
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Optional, Tuple
+
+from lib.address import normalize_address
+
+def parse_cents(value) -> Optional[int]:
+    """"$123,456.78", "123456.78" or 123456.78 -> 12345678; None when there is no amount ("", "Hidden")"""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value * 100
+    if isinstance(value, float):
+        if value != value:  # NaN
+            return None
+        return int(round(value * 100))
+    cleaned = str(value).replace('$', '').replace(',', '').strip()
+    if not cleaned:
+        return None
+    try:
+        return int((Decimal(cleaned) * 100).to_integral_value())
+    except (InvalidOperation, ValueError, OverflowError):
+        return None
+
+def cents_to_dollars(cents: Optional[int]) -> Optional[float]:
+    return None if cents is None else cents / 100
+
+def format_cents(cents: Optional[int]) -> str:
+    """12345678 -> "$123,456.78", the way the auction sites write amounts; "" when there is none"""
+    return "" if cents is None else f"${Decimal(cents).scaleb(-2):,.2f}"
+
+# Money fields of the item dictionary, in output order
+MONEY_FIELDS = ("final_judgment_amount", "assessed_value", "plaintiff_max_bid")
+
+def parse_auction_date(value) -> Optional[date]:
+    """MM/DD/YYYY as used by the auction sites"""
+    if value is None or isinstance(value, date):
+        return value
+    try:
+        return datetime.strptime(value, "%m/%d/%Y").date()
+    except ValueError:
+        return None
+
+@dataclass(slots=True)
+class AuctionRecord:
+    """
+    One auction item with typed fields.
+
+    Money is held in integer cents, the auction date as a date and the
+    address also in normalized form. to_dict() gives the item dictionary
+    that is saved, with money as plain numbers (dollars); amounts the site
+    shows as "Hidden" are None there and listed under "hidden".
+    to_legacy_dict() gives the "$1,234.56"/"Hidden" strings of the
+    original JSON files.
+    """
+    auction_id: str
+    case_number: str
+    parcel_id: str
+    property_address: str
+    final_judgment_cents: Optional[int]
+    assessed_value_cents: Optional[int]
+    plaintiff_max_bid_cents: Optional[int]
+    auction_type: Optional[str] = None
+    auction_date: Optional[date] = None
+    # "Scheduled", "Sold", "Canceled per County", ...; None for items saved before the status was parsed
+    auction_status: Optional[str] = None
+    sold_amount_cents: Optional[int] = None
+    address_key: str = ""
+    # Money fields the site shows as "Hidden" rather than leaving empty
+    hidden: Tuple[str, ...] = ()
+    realtor_link: Optional[str] = None
+    # False until the enrichment stage looked the address up
+    enriched: bool = False
+
+    @classmethod
+    def from_item(cls, item: Dict[str, Any], auction_date=None) -> "AuctionRecord":
+        """Build from a parsed or saved item dictionary (money as strings or numbers)"""
+        property_address = item.get("property_address") or ""
+        address_key = normalize_address(property_address)
+        if address_key == property_address:
+            # Share the string instead of keeping an equal copy
+            address_key = property_address
+        return cls(
+            auction_id=str(item.get("auction_id", "")),
+            case_number=item.get("case_number") or "",
+            parcel_id=item.get("parcel_id") or "",
+            property_address=property_address,
+            final_judgment_cents=parse_cents(item.get("final_judgment_amount")),
+            assessed_value_cents=parse_cents(item.get("assessed_value")),
+            plaintiff_max_bid_cents=parse_cents(item.get("plaintiff_max_bid")),
+            auction_type=item.get("auction_type"),
+            auction_date=parse_auction_date(auction_date),
+            auction_status=item.get("auction_status"),
+            sold_amount_cents=parse_cents(item.get("sold_amount")),
+            address_key=address_key,
+            hidden=tuple(field for field in MONEY_FIELDS
+                         if item.get(field) == "Hidden" or field in item.get("hidden", ())),
+            realtor_link=item.get("realtor_link"),
+            enriched="realtor_link" in item,
+        )
+
+    @property
+    def final_judgment_amount(self) -> Optional[float]:
+        return cents_to_dollars(self.final_judgment_cents)
+
+    @property
+    def assessed_value(self) -> Optional[float]:
+        return cents_to_dollars(self.assessed_value_cents)
+
+    @property
+    def plaintiff_max_bid(self) -> Optional[float]:
+        return cents_to_dollars(self.plaintiff_max_bid_cents)
+
+    @property
+    def sold_amount(self) -> Optional[float]:
+        return cents_to_dollars(self.sold_amount_cents)
+
+    def to_dict(self) -> Dict[str, Any]:
+        item = {"auction_id": self.auction_id}
+        if self.auction_type is not None:
+            item["auction_type"] = self.auction_type
+        item.update({
+            "case_number": self.case_number,
+            "final_judgment_amount": self.final_judgment_amount,
+            "parcel_id": self.parcel_id,
+            "property_address": self.property_address,
+            "assessed_value": self.assessed_value,
+            "plaintiff_max_bid": self.plaintiff_max_bid,
+        })
+        if self.hidden:
+            item["hidden"] = list(self.hidden)
+        if self.auction_status is not None:
+            item["auction_status"] = self.auction_status
+            item["sold_amount"] = self.sold_amount
+        if self.enriched:
+            item["realtor_link"] = self.realtor_link
+        return item
+
+    def to_legacy_dict(self) -> Dict[str, Any]:
+        """Item dictionary as the JSON files had it before the store, with money as "$1,234.56" or "Hidden" strings"""
+        item = self.to_dict()
+        item.pop("hidden", None)
+        amounts = {
+            "final_judgment_amount": self.final_judgment_cents,
+            "assessed_value": self.assessed_value_cents,
+            "plaintiff_max_bid": self.plaintiff_max_bid_cents,
+        }
+        for field, cents in amounts.items():
+            item[field] = "Hidden" if field in self.hidden else format_cents(cents)
+        if self.auction_status is not None:
+            item["sold_amount"] = format_cents(self.sold_amount_cents)
+        return item
+
+def normalize_item(item: Dict[str, Any], record: Optional[AuctionRecord] = None) -> Dict[str, Any]:
+    """Saved shape of an item dictionary, whether its money is strings or numbers"""
+    normalized = (record or AuctionRecord.from_item(item)).to_dict()
+    # Keep anything the record doesn't model
+    for key, value in item.items():
+        normalized.setdefault(key, value)
+    return normalized
+
+def legacy_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape of an item in the JSON files written before the store, from a saved item dictionary"""
+    legacy = AuctionRecord.from_item(item).to_legacy_dict()
+    for key, value in item.items():
+        if key != "hidden":
+            legacy.setdefault(key, value)
+    return legacy
@@ -0,0 +1,174 @@
+import json
+import os
+import re
+import threading
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "counties.json")
+
+REGISTRY = None
+_REGISTRY_LOCK = threading.Lock()
+
+# Item fields in output order: (name, label, marker kind, strip tags)
+# The marker kind picks the start marker: "data" -> <data_marker>">, "link" -> <link_marker>">,
+# "bid" -> <data_marker> ASTAT_MSGPB">
+FIELDS = (
+    ("auction_type", "Auction Type:", "data", False),
+    ("case_number", "Case #:", "link", True),
+    ("final_judgment_amount", "Final Judgment Amount:", "data", False),
+    ("parcel_id", "Parcel ID:", "link", True),
+    ("property_address", "Property Address:", "data", False),
+    ("assessed_value", "Assessed Value:", "data", False),
+    ("plaintiff_max_bid", "Plaintiff Max Bid:", "bid", False),
+)
+
+# Used when the config has no "default" layout
+DEFAULT_LAYOUT = {
+    "end_marker": "@G",
+    "data_marker": "@CAD_DTA",
+    "link_marker": "@CAD_DTA",
+    "auction_type": True,
+    "city_zip_pattern": "@CAD_LBL\\\" scope=\\\"row\\\">@F tabindex=\\\"0\\\" @CAD_DTA\\\">(.*?), FL-\\s*(\\d+)@G",
+    "address_format": "{street}, {city}, FL-{zip}",
+}
+
+@lru_cache(maxsize=None)
+def field_pattern(field_label: str, start_marker: str, end_marker: str) -> "re.Pattern":
+    """Compile (once) the pattern for a label/marker combination"""
+    return re.compile(rf'{field_label}.*?{start_marker}(.*?){end_marker}', re.DOTALL)
+
+class CountyProfile:
+    """
+    How to reach and parse one county's auction site.
+
+    A profile is a layout from the config (markers, city/zip pattern,
+    address format) with the county's own settings on top. All of its
+    patterns are compiled when the profile is built, so parsing an item
+    only runs searches.
+    """
+
+    def __init__(self, name, base_url=None, layout="default", enabled=True, per_host=None, delay=0.0, rate=None,
+                 end_marker="@G", data_marker="@CAD_DTA", link_marker="@CAD_DTA", auction_type=True,
+                 city_zip_pattern=DEFAULT_LAYOUT["city_zip_pattern"], address_format=DEFAULT_LAYOUT["address_format"]):
+        self.name = name
+        self.base_url = base_url
+        self.layout = layout
+        self.enabled = enabled
+        # Throttle: requests in flight on the host (None = crawler default), seconds between auction days
+        # and the starting requests per second of the host's rate limiter (None = limiter default)
+        self.per_host = per_host
+        self.delay = delay
+        self.rate = rate
+        self.end_marker = end_marker
+        self.address_format = address_format
+
+        start_markers = {
+            "data": f'{data_marker}">',
+            "link": f'{link_marker}">',
+            "bid": f'{data_marker} ASTAT_MSGPB">',
+        }
+        self.field_specs = [
+            (field, label, start_markers[kind], strip_tags)
+            for field, label, kind, strip_tags in FIELDS
+            if auction_type or field != "auction_type"
+        ]
+        self.fields = [
+            (field, field_pattern(label, start_marker, end_marker), strip_tags)
+            for field, label, start_marker, strip_tags in self.field_specs
+        ]
+        self.city_zip = re.compile(city_zip_pattern)
+
+    @property
+    def host(self):
+        return urlsplit(self.base_url).netloc.lower() if self.base_url else None
+
+    def property_address(self, html, street):
+        """Street from the "Property Address:" row plus city and zip from the row after it"""
+        match = self.city_zip.search(html)
+        if match:
+            return self.address_format.format(street=street, city=match.group(1).strip(), zip=match.group(2).strip())
+        return street
+
+    def __repr__(self):
+        return f"CountyProfile({self.name!r}, layout={self.layout!r}, enabled={self.enabled})"
+
+class CountyRegistry:
+    """
+    The counties from counties.json.
+
+    The config has "layouts" (how an auction item page is marked up) and
+    "counties" (base URL, layout, enabled flag, throttle settings and any
+    layout key to override). Counties that aren't configured get the
+    default layout.
+    """
+
+    def __init__(self, config):
+        self.layouts = dict(config.get("layouts", {}))
+        self.layouts.setdefault("default", DEFAULT_LAYOUT)
+        self.profiles = {}
+        for name, settings in config.get("counties", {}).items():
+            self.profiles[name.upper()] = self.build(name.upper(), settings)
+        self._fallbacks = {}
+
+    @classmethod
+    def load(cls, path=DEFAULT_PATH):
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def build(self, name, settings):
+        layout = settings.get("layout", "default")
+        if layout not in self.layouts:
+            raise ValueError(f"County {name} uses unknown layout {layout!r}")
+        options = dict(self.layouts[layout])
+        options.update(settings)
+        options["layout"] = layout
+        return CountyProfile(name, **options)
+
+    def get(self, name):
+        """Profile of a county; an unknown name gets the default layout"""
+        key = (name or "default").upper()
+        profile = self.profiles.get(key)
+        if profile is None:
+            profile = self._fallbacks.get(key)
+            if profile is None:
+                profile = self._fallbacks[key] = self.build(key, {})
+        return profile
+
+    def enabled(self):
+        return [profile for profile in self.profiles.values() if profile.enabled]
+
+    def base_urls(self):
+        """County name -> base URL of every enabled county, in config order"""
+        return {profile.name: profile.base_url for profile in self.enabled()}
+
+    def host_rates(self):
+        """Host -> starting rate of every county that sets one"""
+        return {profile.host: profile.rate for profile in self.profiles.values() if profile.rate and profile.host}
+
+    def for_host(self, host):
+        """Profile whose base URL is on the given host, or None"""
+        for profile in self.profiles.values():
+            if profile.host == host:
+                return profile
+        return None
+
+def configure(path=DEFAULT_PATH):
+    """Load the registry from another config file"""
+    global REGISTRY
+    with _REGISTRY_LOCK:
+        REGISTRY = CountyRegistry.load(path)
+    return REGISTRY
+
+def get_registry():
+    global REGISTRY
+    with _REGISTRY_LOCK:
+        if REGISTRY is None:
+            REGISTRY = CountyRegistry.load(DEFAULT_PATH) if os.path.exists(DEFAULT_PATH) else CountyRegistry({})
+        return REGISTRY
+
+def get_profile(county):
+    """Profile of a county name (or the profile itself)"""
+    if isinstance(county, CountyProfile):
+        return county
+    return get_registry().get(county)
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+
+import asyncio
+import sys
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+
+from lib import http_session
+from lib import metrics
+from lib import scrape_state
+from lib.counties import get_registry
+from lib.fc_calendar import CalendarScrapper
+from lib.fc_listing import ListingScrapper
+
+def interleave(jobs):
+    """Order (county, date) jobs round-robin over the counties, so every host gets work from the start"""
+    by_county = {}
+    for job in jobs:
+        by_county.setdefault(job[0], []).append(job)
+    queues = list(by_county.values())
+    ordered = []
+    for position in range(max((len(queue) for queue in queues), default=0)):
+        ordered.extend(queue[position] for queue in queues if position < len(queue))
+    return ordered
+
+def calendar_jobs(calendar_requests, calendars, should_fetch):
+    """
+    The (county, date) jobs of every calendar read
+
+    Args:
+        calendar_requests: (county, calendar URL) pairs
+        calendars: (dates, unchanged) read from each calendar, in the same order
+        should_fetch: Function called with (county, date, unchanged) telling whether the date needs fetching
+
+    Returns:
+        Dictionary mapping (county, calendar URL) to the jobs the calendar needs handled
+    """
+    jobs = {}
+    queued = set()
+    for (county, url), (dates, unchanged) in zip(calendar_requests, calendars):
+        # A date can be on more than one calendar (and asked for twice)
+        jobs[(county, url)] = [(county, date) for date in dates
+                               if (county, date) in queued or should_fetch(county, date, unchanged)]
+        queued.update(jobs[(county, url)])
+    return jobs
+
+def commit_calendars(jobs, finished):
+    """Remember a calendar as seen once all of its dates are handled; jobs as returned by calendar_jobs"""
+    state = scrape_state.get_state()
+    for (county, url), dates in jobs.items():
+        if all(job in finished for job in dates):
+            state.commit_calendar(county, url)
+
+class Crawler:
+    """
+    Fetch calendars and auction days for several counties concurrently.
+
+    Every request holds a slot of the global limit and one of its host's
+    limit. The auction site keeps the previewed auction date in the server
+    side session, so the PREVIEW -> UPDATE/LOAD sequence of one county never
+    interleaves with another date of the same county; counties run side by
+    side, which makes a run take about as long as its slowest county.
+
+    A county profile with throttle settings overrides per_host for its
+    host and can add a delay between its auction days.
+    """
+
+    def __init__(self, max_concurrency=8, per_host=2, listing_scrapper=None, registry=None):
+        self.max_concurrency = max_concurrency
+        self.per_host = per_host
+        self.registry = registry or get_registry()
+        self.calendar_scrapper = CalendarScrapper()
+        self.listing_scrapper = listing_scrapper or ListingScrapper()
+        self._global_limit = None
+        self._host_limits = {}
+        self._day_locks = {}
+
+    def host(self, url):
+        return urlsplit(url).netloc.lower()
+
+    @asynccontextmanager
+    async def limit(self, url):
+        """Hold a global slot and a slot of the url's host."""
+        host = self.host(url)
+        if host not in self._host_limits:
+            profile = self.registry.for_host(host)
+            per_host = profile.per_host if profile and profile.per_host else self.per_host
+            self._host_limits[host] = asyncio.Semaphore(per_host)
+        async with self._global_limit, self._host_limits[host]:
+            yield
+
+    async def fetch_calendar(self, session, county, url):
+        """Return the active auction dates listed on a county calendar, and whether it is unchanged."""
+        try:
+            state = scrape_state.get_state()
+            headers = self.calendar_scrapper.request_headers(state.get_calendar(county, url))
+            async with self.limit(url):
+                with metrics.timer("calendar"):
+                    response = await session.get(url, headers=headers)
+            return self.calendar_scrapper.read_dates(county, url, response, state)
+        except Exception as e:
+            print(f"Error fetching calendar for {county}: {e}", file=sys.stderr)
+            return [], False
+
+    async def fetch_auction_day(self, session, base_url, url):
+        """Return the raw UPDATE/LOAD payload for one auction date."""
+        host = self.host(base_url)
+        if host not in self._day_locks:
+            self._day_locks[host] = asyncio.Lock()
+        profile = self.registry.for_host(host)
+        async with self._day_locks[host]:
+            async with self.limit(base_url):
+                raw_data = await self.listing_scrapper.aget_data_specific_url(url, base_url, session)
+            if profile and profile.delay:
+                # Still holding the day lock, so the county's next date waits
+                await asyncio.sleep(profile.delay)
+            return raw_data
+
+    async def crawl(self, counties, calendar_url, day_url, should_fetch, handle_day):
+        """
+        Crawl every county and hand each auction day to handle_day.
+
+        Args:
+            counties: Dictionary mapping county name to its base URL
+            calendar_url: Function returning the calendar URL for a base URL
+            day_url: Function returning the PREVIEW URL for a base URL and a date
+            should_fetch: Function called with (county, date, unchanged) telling
+                whether the date needs fetching; unchanged is True when the
+                month's calendar is the same as on the last run
+            handle_day: Function called with (county, date, url, raw_data); it
+                runs in a worker thread so parsing and enrichment don't block
+                the other fetches, and returns True when the date was handled
+
+        Returns:
+            Dictionary mapping county name to the number of days fetched
+        """
+        self._global_limit = asyncio.Semaphore(self.max_concurrency)
+        self._host_limits = {}
+        self._day_locks = {}
+        session = http_session.get_factory().new_async_session(workers=self.max_concurrency)
+        loop = asyncio.get_running_loop()
+
+        async def crawl_day(county, date):
+            base_url = counties[county]
+            url = day_url(base_url, date)
+            raw_data = await self.fetch_auction_day(session, base_url, url)
+            return await loop.run_in_executor(None, handle_day, county, date, url, raw_data)
+
+        try:
+            # All calendars at once, then every auction day of every county
+            calendar_requests = [(county, calendar_url(base_url)) for county, base_url in counties.items()]
+            calendars = await asyncio.gather(*(
+                self.fetch_calendar(session, county, url) for county, url in calendar_requests
+            ))
+            for (county, _), (dates, _) in zip(calendar_requests, calendars):
+                if not dates:
+                    print(f"No dates found for {county}.")
+            day_jobs = calendar_jobs(calendar_requests, calendars, should_fetch)
+            fetched = {county: len(jobs) for (county, _), jobs in day_jobs.items()}
+            jobs = interleave([job for jobs in day_jobs.values() for job in jobs])
+            results = await asyncio.gather(*(crawl_day(county, date) for county, date in jobs),
+                                           return_exceptions=True)
+            finished = set()
+            for job, result in zip(jobs, results):
+                if isinstance(result, Exception):
+                    print(f"Error during crawl: {result}", file=sys.stderr)
+                if result is True:
+                    finished.add(job)
+            commit_calendars(day_jobs, finished)
+            return fetched
+        finally:
+            await session.close()
+            await self.listing_scrapper.aclose()
+
+    def run(self, counties, calendar_url, day_url, should_fetch, handle_day):
+        """Blocking wrapper around crawl."""
+        return asyncio.run(self.crawl(counties, calendar_url, day_url, should_fetch, handle_day))
+
+    async def crawl_queue(self, queue, counties, calendar_urls, day_url, should_fetch, handle_day, max_attempts=3):
+        """
+        Crawl through a durable JobQueue.
+
+        Every calendar is read first, all at once, and the dates that
+        should_fetch accepts are deduped and queued in one go, so a backfill
+        over many months is scheduled as one batch. Then the pending jobs,
+        including the ones a crashed run left behind, are worked through;
+        failed jobs are tried again until they reach max_attempts.
+
+        Args:
+            queue: JobQueue holding the (county, date) jobs
+            counties: Dictionary mapping county name to its base URL
+            calendar_urls: Function returning the calendar URLs (one per month) for a base URL
+            day_url: Function returning the PREVIEW URL for a base URL and a date
+            should_fetch: Function called with (county, date, unchanged) telling
+                whether the date needs fetching (see crawl)
+            handle_day: Function called with (county, date, url, raw_data) in a
+                worker thread; it returns True when the date was handled, any
+                other result fails the job
+            max_attempts: Attempts per job, over this run and earlier ones
+
+        Returns:
+            Dictionary of job counts by status
+        """
+        self._global_limit = asyncio.Semaphore(self.max_concurrency)
+        self._host_limits = {}
+        self._day_locks = {}
+        session = http_session.get_factory().new_async_session(workers=self.max_concurrency)
+        loop = asyncio.get_running_loop()
+
+        finished = set()
+
+        async def crawl_job(county, date):
+            queue.start(county, date)
+            try:
+                base_url = counties[county]
+                url = day_url(base_url, date)
+                raw_data = await self.fetch_auction_day(session, base_url, url)
+                handled = await loop.run_in_executor(None, handle_day, county, date, url, raw_data)
+            except Exception as e:
+                print(f"Error crawling {county} {date}: {e}", file=sys.stderr)
+                queue.fail(county, date, e)
+                return
+            if handled is True:
+                queue.done(county, date)
+                finished.add((county, date))
+            else:
+                queue.fail(county, date, "no valid auction data")
+
+        try:
+            recovered = queue.recover()
+            if recovered:
+                print(f"Resuming {recovered} jobs left running by an earlier run")
+            calendar_requests = [(county, url) for county, base_url in counties.items() for url in calendar_urls(base_url)]
+            calendars = await asyncio.gather(*(
+                self.fetch_calendar(session, county, url) for county, url in calendar_requests
+            ))
+            day_jobs = calendar_jobs(calendar_requests, calendars, should_fetch)
+            jobs = dict.fromkeys(job for jobs in day_jobs.values() for job in jobs)
+            queue.add_many(jobs)
+            print(f"Queued {len(jobs)} auction dates from {len(calendar_requests)} calendars")
+
+            while True:
+                jobs = queue.claimable(max_attempts, counties=counties)
+                if not jobs:
+                    break
+                print(f"Working through {len(jobs)} jobs")
+                await asyncio.gather(*(crawl_job(county, date) for county, date in interleave(jobs)))
+            commit_calendars(day_jobs, finished)
+            return queue.counts()
+        finally:
+            await session.close()
+            await self.listing_scrapper.aclose()
+
+    def run_queue(self, queue, counties, calendar_urls, day_url, should_fetch, handle_day, max_attempts=3):
+        """Blocking wrapper around crawl_queue."""
+        return asyncio.run(self.crawl_queue(queue, counties, calendar_urls, day_url, should_fetch, handle_day,
+                                            max_attempts))
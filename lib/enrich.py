@@ -0,0 +1,147 @@
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from lib import metrics
+from lib.address import canonical_address
+from lib.realtor_data import LOOKUP_FAILED, RealtorData
+
+class Enricher:
+    """
+    Add realtor.com links to auction items as a separate stage.
+
+    The addresses of a batch are deduplicated first (by canonical address),
+    and the unique ones are looked up by a bounded pool of worker threads;
+    properties the match index knows never reach the network.
+    """
+
+    def __init__(self, workers=8, realtor_data=None):
+        self.workers = workers
+        self.realtor_data = realtor_data or RealtorData()
+        self.lookups = 0
+        self.failures = 0
+
+    def lookup(self, address, parcel_id=None, county=None):
+        try:
+            with metrics.timer("realtor_lookup"):
+                return self.realtor_data.get_property_address(address, parcel_id, county)
+        except Exception as e:
+            print(f"Error looking up {address}: {e}", file=sys.stderr)
+            return LOOKUP_FAILED
+
+    def enrich(self, auction_items, force=True, county=None):
+        """
+        Set realtor_link on every item
+
+        An item whose lookup failed is left without a realtor_link (a link it
+        already had is kept), so the next run tries it again.
+
+        Args:
+            auction_items: Auction item dictionaries
+            force: Also look up items that already have a realtor_link
+            county: County of the items; without it, parcel IDs aren't matched
+
+        Returns:
+            The same list of items
+        """
+        self.enrich_items([(county, item) for item in auction_items], force)
+        return auction_items
+
+    def enrich_items(self, county_items, force=True):
+        """Set realtor_link on the items of (county, item) pairs, which may come from several counties"""
+        pending = [(county, item) for county, item in county_items if force or 'realtor_link' not in item]
+        addresses = {}
+        for county, item in pending:
+            addresses.setdefault(canonical_address(item.get('property_address')), (county, item))
+        if not addresses:
+            return
+
+        keys = list(addresses.keys())
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            links = dict(zip(keys, executor.map(self.lookup,
+                                                (addresses[key][1].get('property_address') for key in keys),
+                                                (addresses[key][1].get('parcel_id') for key in keys),
+                                                (addresses[key][0] for key in keys))))
+        self.lookups += len(keys)
+
+        matches = []
+        for county, item in pending:
+            link = links[canonical_address(item.get('property_address'))]
+            if link is LOOKUP_FAILED:
+                self.failures += 1
+                metrics.incr("realtor_failures")
+                continue
+            item['realtor_link'] = link
+            matches.append((county, item.get('parcel_id'), item.get('property_address'), link))
+        # Every parcel of the batch is remembered, not only the one its address was looked up with
+        self.realtor_data.index.add_many(matches)
+
+    def enrich_files(self, paths, force=False):
+        """
+        Enrich saved data/<COUNTY>/<date>.json files in place as one batch
+
+        Args:
+            paths: data/<COUNTY>/<date>.json files written by fc.py
+            force: Look up items that already have a realtor_link again
+
+        Returns:
+            Number of files that were rewritten
+        """
+        loaded = []
+        for path in paths:
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Error reading {path}: {e}", file=sys.stderr)
+                continue
+            if isinstance(data, dict) and 'auction_items' in data:
+                loaded.append((path, data))
+
+        # The county is the name of the file's directory
+        dirty = self.enrich_batch([(os.path.basename(os.path.dirname(os.path.abspath(path))), data)
+                                   for path, data in loaded], force)
+        for path, data in loaded:
+            if id(data) not in dirty:
+                continue
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f, indent=4, default=str)
+            os.replace(tmp_path, path)
+        return len(dirty)
+
+    def enrich_store(self, store, keys, force=False):
+        """
+        Enrich auction dates of an AuctionStore in place as one batch
+
+        Args:
+            store: AuctionStore holding the dates
+            keys: (county, date) pairs to enrich
+            force: Look up items that already have a realtor_link again
+
+        Returns:
+            Number of dates that were updated
+        """
+        loaded = []
+        for county, date in dict.fromkeys(keys):
+            data = store.load(county, date)
+            if data is not None:
+                loaded.append((county, data))
+
+        with metrics.timer("enrich"):
+            dirty = self.enrich_batch(loaded, force)
+        for county, data in loaded:
+            if id(data) in dirty:
+                with metrics.timer("save"):
+                    store.save(county, data)
+        return len(dirty)
+
+    def enrich_batch(self, datasets, force=False):
+        """Enrich the items of several (county, data) auction dates together; returns the ids of the changed data"""
+        # Only dates with items still to look up are written back
+        dirty = [(county, data) for county, data in datasets
+                 if any(force or 'realtor_link' not in item for item in data['auction_items'])]
+        if dirty:
+            self.enrich_items([(county, item) for county, data in dirty for item in data['auction_items']], force=force)
+        return {id(data) for _, data in dirty}
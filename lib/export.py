@@ -0,0 +1,134 @@
+import csv
+import math
+import os
+
+# Columns of the filtered output, in the order save_to_excel writes them
+OUTPUT_COLUMNS = ("property_address", "assessed_value", "final_judgment_amount", "auction_date", "realtor_link")
+# Output columns that hold numbers (dollars); the others are text
+NUMBER_COLUMNS = ("assessed_value", "final_judgment_amount", "plaintiff_max_bid")
+# Rows handed to a writer at a time when exporting a DataFrame
+CHUNK_SIZE = 10000
+
+def cell(value):
+    """NaN/NaT and other missing values -> None, numpy scalars -> plain Python"""
+    if value is None:
+        return None
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if hasattr(value, "item"):
+        value = value.item()
+        if isinstance(value, float) and math.isnan(value):
+            return None
+    return value
+
+class CsvWriter:
+    """Write rows to a CSV file as they come"""
+
+    def __init__(self, filename, columns=OUTPUT_COLUMNS):
+        self.filename = filename
+        self.columns = columns
+        self.rows = 0
+        self._file = open(filename, 'w', newline='')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(columns)
+
+    def write_rows(self, rows):
+        rows = [["" if value is None else value for value in map(cell, row)] for row in rows]
+        self._writer.writerows(rows)
+        self.rows += len(rows)
+
+    def close(self):
+        self._file.close()
+
+class XlsxWriter:
+    """Write rows to an .xlsx file as they come (openpyxl write-only mode, rows are not kept in memory)"""
+
+    def __init__(self, filename, columns=OUTPUT_COLUMNS):
+        from openpyxl import Workbook
+
+        self.filename = filename
+        self.columns = columns
+        self.rows = 0
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet("Sheet1")
+        self._sheet.append(list(columns))
+
+    def write_rows(self, rows):
+        for row in rows:
+            self._sheet.append([cell(value) for value in row])
+            self.rows += 1
+
+    def close(self):
+        self._workbook.save(self.filename)
+
+class ParquetWriter:
+    """Write rows to a Parquet file as they come, one row group per batch_size rows (needs pyarrow)"""
+
+    def __init__(self, filename, columns=OUTPUT_COLUMNS, batch_size=50000):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Parquet output needs pyarrow (pip install pyarrow)")
+
+        self.filename = filename
+        self.columns = columns
+        self.batch_size = batch_size
+        self.rows = 0
+        self._pa = pa
+        self._schema = pa.schema([(column, pa.float64() if column in NUMBER_COLUMNS else pa.string())
+                                  for column in columns])
+        self._writer = pq.ParquetWriter(filename, self._schema)
+        self._pending = []
+
+    def write_rows(self, rows):
+        for row in rows:
+            self._pending.append([cell(value) for value in row])
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        pa = self._pa
+        arrays = []
+        for field, values in zip(self._schema, zip(*self._pending)):
+            if field.type == pa.string():
+                values = [None if value is None else str(value) for value in values]
+            arrays.append(pa.array(values, type=field.type))
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self._schema))
+        self.rows += len(self._pending)
+        self._pending = []
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+WRITERS = {
+    ".csv": CsvWriter,
+    ".xlsx": XlsxWriter,
+    ".parquet": ParquetWriter,
+}
+
+def open_writer(filename, columns=OUTPUT_COLUMNS):
+    """Streaming writer for the file's extension (.csv, .xlsx or .parquet)"""
+    extension = os.path.splitext(filename)[1].lower()
+    if extension not in WRITERS:
+        raise ValueError(f"Unsupported output format {extension!r}, use one of {', '.join(WRITERS)}")
+    return WRITERS[extension](filename, columns)
+
+def frame_rows(frame, columns=OUTPUT_COLUMNS, chunk_size=CHUNK_SIZE):
+    """Yield lists of row tuples from a DataFrame, chunk by chunk; columns it doesn't have come out empty"""
+    frame = frame.reindex(columns=list(columns))
+    for start in range(0, len(frame), chunk_size):
+        yield list(frame.iloc[start:start + chunk_size].itertuples(index=False, name=None))
+
+def export_frame(frame, filename, columns=OUTPUT_COLUMNS):
+    """Write a DataFrame to filename in the format of its extension; returns the rows written"""
+    writer = open_writer(filename, columns)
+    try:
+        for rows in frame_rows(frame, columns):
+            writer.write_rows(rows)
+    finally:
+        writer.close()
+    return writer.rows
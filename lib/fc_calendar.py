@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+import calendar
+import hashlib
+from datetime import date, datetime
+
+import lxml.html
+from lxml import etree
+
+from lib import metrics
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+def has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+# dayid of every CALBOX (in the first CALDAYBOX) with a span.CALMSG span.CALACT in it
+ACTIVE_DAYS = etree.XPath(
+    f"(//div[{has_class('CALDAYBOX')}])[1]//div[{has_class('CALBOX')}]"
+    f"[.//span[{has_class('CALMSG')}]//span[{has_class('CALACT')}]]/@dayid"
+)
+
+def parse_bound(value, end=False):
+    """A --from/--to value (YYYY-MM or YYYY-MM-DD) as a date; a month means its first day, or its last with end"""
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        month = datetime.strptime(value, "%Y-%m")
+    day = calendar.monthrange(month.year, month.month)[1] if end else 1
+    return date(month.year, month.month, day)
+
+def months_between(first, last):
+    """Every month (YYYY-MM) from the one of first to the one of last"""
+    months = []
+    year, month = first.year, first.month
+    while (year, month) <= (last.year, last.month):
+        months.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+def content_hash(body):
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+class CalendarScrapper:
+
+    def get_calendar_url(self, base_url, next_month=False, month=None):
+        """Build the calendar URL for the current month, the next one, or a given month (YYYY-MM)."""
+        if month:
+            selected = datetime.strptime(month, "%Y-%m")
+            return f"{base_url}/index.cfm?zaction=USER&zmethod=CALENDAR&selCalDate={selected.strftime('%m/01/%Y')}"
+        if next_month:
+            from dateutil.relativedelta import relativedelta
+            # Add one month to get next month
+            next_month_date = datetime.now() + relativedelta(months=1)
+            # Format the date as MM/01/YYYY (first day of next month)
+            formatted_date = next_month_date.strftime("%m/01/%Y")
+            #/index.cfm?zaction=user&zmethod=calendar&selCalDate=04/01/2025
+            return f"{base_url}/index.cfm?zaction=USER&zmethod=CALENDAR&selCalDate={formatted_date}"
+        # Use the default URL (current month)
+        return f"{base_url}/index.cfm?zaction=USER&zmethod=CALENDAR"
+
+    def parse_dates(self, html):
+        """Return the dayid of every calendar day that has an active auction."""
+        # lxml and one XPath over the calendar boxes, no soup of the whole page
+        return [str(day_id) for day_id in ACTIVE_DAYS(lxml.html.fromstring(html)) if day_id]
+
+    def request_headers(self, previous):
+        """Headers of a conditional request for a calendar seen before (previous = its saved state)"""
+        headers = dict(HEADERS)
+        if previous:
+            if previous["etag"]:
+                headers['If-None-Match'] = previous["etag"]
+            if previous["last_modified"]:
+                headers['If-Modified-Since'] = previous["last_modified"]
+        return headers
+
+    def read_dates(self, county, url, response, state):
+        """
+        Active days of a calendar response, and whether the calendar is the same as last time
+
+        A 304 or a body with the same content hash gives the days saved with
+        the last calendar without parsing anything; a changed calendar is
+        parsed and staged in the scrape state, for the caller to commit once
+        the month's dates are handled.
+        """
+        previous = state.get_calendar(county, url)
+        if response.status_code == 304 and previous:
+            metrics.incr("calendars_unchanged")
+            return previous["active_days"], True
+        response.raise_for_status()
+        digest = content_hash(response.content)
+        if previous and previous["content_hash"] == digest:
+            metrics.incr("calendars_unchanged")
+            return previous["active_days"], True
+        dates = self.parse_dates(response.content)
+        state.stage_calendar(county, url, response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                             digest, dates)
+        metrics.incr("calendars_changed")
+        return dates, False
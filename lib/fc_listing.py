@@ -1,36 +1,109 @@
 #!/usr/bin/env python3
 
+import asyncio
+import json
 import sys
 import time
 import requests
-from requests_html import HTMLSession
+from lib import metrics
+from lib.fc_calendar import HEADERS
 
 class ListingScrapper:
+    """
+    Fetch the UPDATE/LOAD payload of an auction date.
+
+    The payload only depends on the session cookies set by the PREVIEW page,
+    so by default the page is loaded with plain HTTP and the AJAX call made
+    right away. Chromium (response.html.render()) is only started when that
+    fast path returns an empty or invalid rlist, or when fast=False;
+    requests_html and pyppeteer are only imported then.
+    """
+
+    def __init__(self, fast=True):
+        self.fast = fast
+        self.fallback_count = 0
+        self.timings = {"fast": [], "render": []}
+        # requests_html sessions that own the Chromium of the render fallback, started on first use
+        self._browser_session = None
+        self._async_browser_session = None
+
+    def get_ajax_url(self, base_url):
+        """URL of the AJAX call that returns the items of the previewed auction date."""
+        timestamp1 = int(time.time() * 1000)
+        timestamp2 = timestamp1 + 451
+
+        #ajax_url = f"https://polk.realforeclose.com/index.cfm?zaction=AUCTION&ZMETHOD=UPDATE&FNC=UPDATE&ref={ref_ids},&tx={timestamp1}&_={timestamp2}"
+        return f"{base_url}/index.cfm?zaction=AUCTION&Zmethod=UPDATE&FNC=LOAD&AREA=W&PageDir=0&doR=1&tx={timestamp1}&bypassPage=1&test=1&_={timestamp2}"
+
+    def get_ajax_headers(self, url):
+        """Headers jQuery sends with the AJAX call from the PREVIEW page."""
+        return dict(HEADERS, **{
+            'Referer': url,
+            'X-Requested-With': 'XMLHttpRequest',
+            'Accept': 'application/json, text/javascript, */*; q=0.01',
+        })
+
+    def is_valid_payload(self, raw_data):
+        """True when the payload is JSON with a non-empty rlist."""
+        try:
+            data = json.loads(raw_data)
+        except (TypeError, ValueError):
+            return False
+        return isinstance(data, dict) and bool(str(data.get("rlist") or "").strip())
+
+    def render(self, response):
+        """Execute the page's JavaScript in Chromium (what response.html.render() did)"""
+        from requests_html import HTML, HTMLSession
+
+        if self._browser_session is None:
+            self._browser_session = HTMLSession()
+        HTML(session=self._browser_session, url=response.url, html=response.content,
+             default_encoding=response.encoding or 'utf-8').render()
+
+    async def arender(self, response):
+        """Same as render, from a coroutine"""
+        from requests_html import HTML, AsyncHTMLSession
+
+        loop = asyncio.get_running_loop()
+        if self._async_browser_session is None or self._async_browser_session.loop is not loop:
+            self._async_browser_session = AsyncHTMLSession(loop=loop)
+        await HTML(session=self._async_browser_session, url=response.url, html=response.content,
+                   default_encoding=response.encoding or 'utf-8').arender()
+
+    def close(self):
+        """Close the Chromium of the render fallback, if one was started"""
+        if self._browser_session is not None:
+            self._browser_session.close()
+            self._browser_session = None
+
+    async def aclose(self):
+        """Close the Chromium of the async render fallback, if one was started"""
+        if self._async_browser_session is not None:
+            await self._async_browser_session.close()
+            self._async_browser_session = None
+
+    def record_timing(self, path, started):
+        self.timings[path].append(time.perf_counter() - started)
 
     def get_data_specific_url(self, url, base_url, session):
         """Scrape foreclosure dates from the provided URL."""
         try:
-            # Add headers to mimic Chrome browser
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
+            if self.fast:
+                started = time.perf_counter()
+                try:
+                    raw_data = self.fetch_payload(url, base_url, session, render=False)
+                except requests.exceptions.RequestException as e:
+                    print(f"Error fetching the webpage without rendering: {e}", file=sys.stderr)
+                    raw_data = None
+                self.record_timing("fast", started)
+                if self.is_valid_payload(raw_data):
+                    return raw_data
+                self.fallback_count += 1
 
-            response = session.get(url, headers=headers)
-            
-            # This will execute JavaScript on the page
-            response.html.render()
-
-            timestamp1 = int(time.time() * 1000)
-            timestamp2 = timestamp1 + 451
-
-            #ajax_url = f"https://polk.realforeclose.com/index.cfm?zaction=AUCTION&ZMETHOD=UPDATE&FNC=UPDATE&ref={ref_ids},&tx={timestamp1}&_={timestamp2}"
-            ajax_url = f"{base_url}/index.cfm?zaction=AUCTION&Zmethod=UPDATE&FNC=LOAD&AREA=W&PageDir=0&doR=1&tx={timestamp1}&bypassPage=1&test=1&_={timestamp2}"
-            
-            # Make the AJAX request
-            ajax_response = session.get(ajax_url)
-            #print(f"ajax_response: {ajax_response.text.strip()}")
-            
-            return ajax_response.text.strip()
+            started = time.perf_counter()
+            raw_data = self.fetch_payload(url, base_url, session, render=True)
+            self.record_timing("render", started)
+            return raw_data
         except requests.exceptions.RequestException as e:
             print(f"Error fetching the webpage: {e}", file=sys.stderr)
             return []
@@ -38,6 +111,42 @@ class ListingScrapper:
             print(f"Error during scraping: {e}", file=sys.stderr)
                         
             return []
+
+    def fetch_payload(self, url, base_url, session, render):
+        with metrics.timer("page_load"):
+            response = session.get(url, headers=HEADERS)
+
+        if render:
+            # This will execute JavaScript on the page
+            with metrics.timer("render"):
+                self.render(response)
+
+        # Make the AJAX request
+        with metrics.timer("ajax"):
+            ajax_response = session.get(self.get_ajax_url(base_url), headers=self.get_ajax_headers(url))
+        #print(f"ajax_response: {ajax_response.text.strip()}")
+
+        return ajax_response.text.strip()
+
+    async def aget_data_specific_url(self, url, base_url, session):
+        """Same as get_data_specific_url, for an AsyncSession."""
+        try:
+            if self.fast:
+                started = time.perf_counter()
+                try:
+                    raw_data = await self.afetch_payload(url, base_url, session, render=False)
+                except requests.exceptions.RequestException as e:
+                    print(f"Error fetching the webpage without rendering: {e}", file=sys.stderr)
+                    raw_data = None
+                self.record_timing("fast", started)
+                if self.is_valid_payload(raw_data):
+                    return raw_data
+                self.fallback_count += 1
+
+            started = time.perf_counter()
+            raw_data = await self.afetch_payload(url, base_url, session, render=True)
+            self.record_timing("render", started)
+            return raw_data
         except requests.exceptions.RequestException as e:
             print(f"Error fetching the webpage: {e}", file=sys.stderr)
             return []
@@ -45,6 +154,28 @@ class ListingScrapper:
             print(f"Error during scraping: {e}", file=sys.stderr)
             return []
 
+    async def afetch_payload(self, url, base_url, session, render):
+        with metrics.timer("page_load"):
+            response = await session.get(url, headers=HEADERS)
+
+        if render:
+            with metrics.timer("render"):
+                await self.arender(response)
+
+        with metrics.timer("ajax"):
+            ajax_response = await session.get(self.get_ajax_url(base_url), headers=self.get_ajax_headers(url))
+
+        return ajax_response.text.strip()
+
+    def summary(self):
+        """One line with the fetch count, average time and fallbacks of each path."""
+        parts = []
+        for path, timings in self.timings.items():
+            if timings:
+                parts.append(f"{path}: {len(timings)} calls, avg {sum(timings) / len(timings):.2f}s")
+        parts.append(f"render fallbacks: {self.fallback_count}")
+        return "Listing fetches - " + ", ".join(parts)
+
 # # This should be outside the class definition
 # if __name__ == "__main__":
 #     # Create an instance of ListingScrapper
@@ -1,4 +1,6 @@
 import pandas as pd
+from lib.export import export_frame
+from lib.filter_engine import parse_money
 import datetime
 import random
 
@@ -30,9 +32,13 @@ class FilterData:
         
         return filtered_items
 
-    def save_to_excel(self, filtered_items):
+    def save_to_excel(self, filtered_items, filename=None):
+        """Write the filtered items to filename (.xlsx, .csv or .parquet, default: filtered_<timestamp>.xlsx)"""
         # Convert to DataFrame and save as Excel
-        if filtered_items:
+        if isinstance(filtered_items, pd.DataFrame):
+            # Already typed (FilterEngine), money columns are numbers
+            df = filtered_items if not filtered_items.empty else None
+        elif filtered_items:
             # Flatten the list if it contains nested lists
             flat_items = []
             for item_list in filtered_items:
@@ -45,20 +51,23 @@ class FilterData:
             df = pd.DataFrame(flat_items)
             
             # Clean up monetary values (remove $ and commas)
+            # (items saved since the typed records already hold numbers)
             if 'final_judgment_amount' in df.columns:
-                df['final_judgment_amount'] = df['final_judgment_amount'].str.replace('$', '').str.replace(',', '').astype(float)
+                df['final_judgment_amount'] = parse_money(df['final_judgment_amount'])
             if 'assessed_value' in df.columns:
-                df['assessed_value'] = df['assessed_value'].str.replace('$', '').str.replace(',', '').astype(float)
-            
-            # rearrange columns so 'property_address' is first, 'assessed_value' is second and 'final_judgment_amount' is third
-            df = df[['property_address', 'assessed_value', 'final_judgment_amount', 'auction_date', 'realtor_link']]
-            
+                df['assessed_value'] = parse_money(df['assessed_value'])
+        else:
+            df = None
+
+        if df is not None:
             # Generate timestamp for filename
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
             
-            # Save to Excel
-            excel_filename = f"filtered_{timestamp}.xlsx"
-            df.to_excel(excel_filename, index=False)
+            # Written chunk by chunk in the output column order ('property_address',
+            # 'assessed_value', 'final_judgment_amount', 'auction_date', 'realtor_link');
+            # a column no item has, such as realtor_link before enrichment, stays empty
+            excel_filename = filename or f"filtered_{timestamp}.xlsx"
+            export_frame(df, excel_filename)
             print(f"Filtered data saved to {excel_filename}")
         else:
             print("No items matched the filter criteria")
\ No newline at end of file
@@ -0,0 +1,210 @@
+import sqlite3
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+# The item fields the table holds: what the rules and the output (export.OUTPUT_COLUMNS) use, plus auction_id
+MONEY_COLUMNS = ("final_judgment_amount", "assessed_value")
+TEXT_COLUMNS = ("auction_id", "auction_type", "property_address", "realtor_link")
+# The auction_items columns from_store reads (money in cents)
+STORE_MONEY_COLUMNS = ("final_judgment_amount_cents", "assessed_value_cents")
+STORE_COLUMNS = ("county", "auction_date", "auction_day", "position") + TEXT_COLUMNS + STORE_MONEY_COLUMNS
+
+def money_value(value):
+    """"$123,456.78" (or a number) -> float, NaN where there is no amount (None, empty, "Hidden", ...)"""
+    if isinstance(value, str):
+        try:
+            return float(value.replace('$', '').replace(',', ''))
+        except ValueError:
+            return np.nan
+    if value is None:
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+def parse_money(values):
+    """"$123,456.78" strings (or numbers) -> float64, NaN where there is no amount (empty, "Hidden", ...)"""
+    series = pd.Series(values)
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        return series.astype('float64')
+    parsed = np.fromiter(map(money_value, series.to_numpy()), dtype='float64', count=len(series))
+    return pd.Series(parsed, index=series.index)
+
+def store_conditions(min_assessed=None, max_assessed=None, max_judgment=None, assessed_over_judgment=False,
+                     min_equity_ratio=None, counties=None, date_from=None, date_to=None, auction_types=None):
+    """The rules of FilterEngine.mask as SQL conditions on auction_items; returns (conditions, params)"""
+    assessed, judgment = "assessed_value_cents / 100.0", "final_judgment_amount_cents / 100.0"
+    conditions, params = [], []
+    # NULL compares false, like NaN in mask()
+    if min_assessed is not None:
+        conditions.append(f"{assessed} > ?")
+        params.append(min_assessed)
+    if max_assessed is not None:
+        conditions.append(f"{assessed} < ?")
+        params.append(max_assessed)
+    if max_judgment is not None:
+        conditions.append(f"{judgment} < ?")
+        params.append(max_judgment)
+    if assessed_over_judgment:
+        conditions.append(f"{assessed} > {judgment}")
+    if min_equity_ratio is not None:
+        conditions.append(f"({assessed} - {judgment}) / ({assessed}) >= ?")
+        params.append(min_equity_ratio)
+    if counties:
+        conditions.append(f"county IN ({', '.join('?' * len(counties))})")
+        params.extend(county.upper() for county in counties)
+    if date_from is not None:
+        conditions.append("auction_day >= ?")
+        params.append(pd.Timestamp(date_from).strftime("%Y-%m-%d"))
+    if date_to is not None:
+        conditions.append("auction_day <= ?")
+        params.append(pd.Timestamp(date_to).strftime("%Y-%m-%d"))
+    if auction_types:
+        conditions.append(f"auction_type IN ({', '.join('?' * len(auction_types))})")
+        params.extend(auction_type.upper() for auction_type in auction_types)
+    return conditions, params
+
+class FilterEngine:
+    """
+    Filter auction items as one typed table.
+
+    Currency strings are converted once when the table is built, and every
+    rule is a vectorized boolean mask over the whole table. Bounds are
+    exclusive, like FilterData.filer.
+    """
+
+    def __init__(self, frame):
+        self.frame = frame
+
+    @classmethod
+    def from_columns(cls, columns):
+        """Build from a dict of columns: county, auction_date, money (float64) and text columns, same length"""
+        frame = pd.DataFrame(columns, copy=False)
+        frame["county"] = frame["county"].astype("category")
+        frame["auction_type"] = frame["auction_type"].astype("category")
+        frame["auction_day"] = pd.to_datetime(frame["auction_date"], format="%m/%d/%Y", errors="coerce")
+        return cls(frame)
+
+    @classmethod
+    def from_frame(cls, frame):
+        """Build from a DataFrame of raw item fields (money as strings) plus county and auction_date"""
+        columns = {"county": frame["county"].to_numpy(), "auction_date": frame["auction_date"].to_numpy()}
+        for column in TEXT_COLUMNS:
+            columns[column] = frame[column].to_numpy() if column in frame.columns else None
+        for column in MONEY_COLUMNS:
+            columns[column] = parse_money(frame[column].to_numpy()).to_numpy() if column in frame.columns else np.nan
+        return cls.from_columns(columns)
+
+    @classmethod
+    def from_datasets(cls, datasets):
+        """Build from (county, data) pairs as yielded by AuctionStore.iter_data"""
+        columns = {column: [] for column in ("county", "auction_date") + TEXT_COLUMNS + MONEY_COLUMNS}
+        for county, data in datasets:
+            items = data.get("auction_items", [])
+            columns["county"] += [county] * len(items)
+            columns["auction_date"] += [data["auction_date"]] * len(items)
+            for column in TEXT_COLUMNS:
+                columns[column] += [item.get(column) for item in items]
+            for column in MONEY_COLUMNS:
+                columns[column] += [money_value(item.get(column)) for item in items]
+        for column in MONEY_COLUMNS:
+            columns[column] = np.array(columns[column], dtype='float64')
+        return cls.from_columns(columns)
+
+    @classmethod
+    def from_store(cls, path, county=None, day_from=None, day_to=None, **rules):
+        """
+        Build straight from the item columns of an AuctionStore database (money stored in cents)
+
+        Only the columns the rules and the output use are read, and the rules
+        are applied in the query, so only matching items are loaded.
+
+        Args:
+            path: SQLite store
+            county: Only load this county
+            day_from: First auction day to load (YYYY-MM-DD)
+            day_to: Last auction day to load (YYYY-MM-DD)
+            rules: Rules of mask() to apply in the query
+        """
+        conditions, params = store_conditions(**rules)
+        if county:
+            conditions.append("county = ?")
+            params.append(county)
+        if day_from:
+            conditions.append("auction_day >= ?")
+            params.append(day_from)
+        if day_to:
+            conditions.append("auction_day <= ?")
+            params.append(day_to)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with closing(sqlite3.connect(path)) as conn:
+            rows = conn.execute(f"SELECT {', '.join(STORE_COLUMNS)} FROM auction_items {where}", params).fetchall()
+        values = list(zip(*rows)) if rows else [()] * len(STORE_COLUMNS)
+        columns = {}
+        for column, column_values in zip(STORE_COLUMNS, values):
+            if column in STORE_MONEY_COLUMNS:
+                columns[column[:-len("_cents")]] = np.array(column_values, dtype="float64") / 100.0
+            else:
+                columns[column] = np.array(column_values, dtype=object)
+        # Sorted here rather than in the query, once only the matching items are left
+        order = np.lexsort((columns.pop("position").astype("int64"), columns.pop("auction_day"), columns["county"]))
+        return cls.from_columns({column: column_values[order] for column, column_values in columns.items()})
+
+    def mask(self, min_assessed=None, max_assessed=None, max_judgment=None, assessed_over_judgment=False,
+             min_equity_ratio=None, counties=None, date_from=None, date_to=None, auction_types=None):
+        """
+        Boolean mask of the items matching every given rule
+
+        Args:
+            min_assessed: Assessed value must be greater than this
+            max_assessed: Assessed value must be less than this
+            max_judgment: Final judgment amount must be less than this
+            assessed_over_judgment: Assessed value must be greater than the judgment
+            min_equity_ratio: (assessed - judgment) / assessed must be at least this
+            counties: Only these counties
+            date_from: First auction day to include (anything pandas can parse)
+            date_to: Last auction day to include
+            auction_types: Only these auction types (e.g. FORECLOSURE, TAXDEED)
+        """
+        frame = self.frame
+        assessed = frame["assessed_value"].to_numpy()
+        judgment = frame["final_judgment_amount"].to_numpy()
+        mask = np.ones(len(frame), dtype=bool)
+        # NaN compares False, so items without an amount drop out of any money rule
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if min_assessed is not None:
+                mask &= assessed > min_assessed
+            if max_assessed is not None:
+                mask &= assessed < max_assessed
+            if max_judgment is not None:
+                mask &= judgment < max_judgment
+            if assessed_over_judgment:
+                mask &= assessed > judgment
+            if min_equity_ratio is not None:
+                mask &= (assessed - judgment) / assessed >= min_equity_ratio
+        if counties:
+            mask &= frame["county"].isin([county.upper() for county in counties]).to_numpy()
+        if date_from is not None:
+            mask &= (frame["auction_day"] >= pd.Timestamp(date_from)).to_numpy()
+        if date_to is not None:
+            mask &= (frame["auction_day"] <= pd.Timestamp(date_to)).to_numpy()
+        if auction_types:
+            mask &= frame["auction_type"].isin([auction_type.upper() for auction_type in auction_types]).to_numpy()
+        return mask
+
+    def filter(self, **rules):
+        """The matching items as a DataFrame; takes the same rules as mask()"""
+        return self.frame[self.mask(**rules)]
+
+    @staticmethod
+    def legacy_rules(min=0, max=10000000):
+        """The rules of FilterData.filer: assessed > judgment, judgment < max, min < assessed < max"""
+        return {
+            "assessed_over_judgment": True,
+            "max_judgment": max,
+            "min_assessed": min,
+            "max_assessed": max,
+        }
@@ -0,0 +1,135 @@
+import json
+import os
+import sqlite3
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+
+from lib.export import OUTPUT_COLUMNS
+from lib.filter_engine import FilterEngine
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def load_json(path):
+    """Read a JSON file, with orjson when it is installed"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def store_partitions(path, counties=None, date_from=None, date_to=None):
+    """
+    Split an AuctionStore into (county, first day, last day) partitions of one month each
+
+    Args:
+        path: SQLite store
+        counties: Only these counties
+        date_from: First auction day to include (YYYY-MM-DD)
+        date_to: Last auction day to include (YYYY-MM-DD)
+    """
+    with closing(sqlite3.connect(path)) as conn:
+        months = conn.execute(
+            "SELECT DISTINCT county, substr(auction_day, 1, 7) FROM auction_dates ORDER BY 1, 2"
+        ).fetchall()
+    wanted = {county.upper() for county in counties} if counties else None
+    partitions = []
+    for county, month in months:
+        if wanted is not None and county not in wanted:
+            continue
+        first, last = f"{month}-01", f"{month}-31"
+        if date_from:
+            first = max(first, date_from)
+        if date_to:
+            last = min(last, date_to)
+        if first <= last:
+            partitions.append(("store", path, county, first, last))
+    return partitions
+
+def json_partitions(path, counties=None):
+    """One partition per data/<COUNTY>/<date>.json file"""
+    wanted = {county.upper() for county in counties} if counties else None
+    partitions = []
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        county = os.path.basename(os.path.normpath(root))
+        if wanted is not None and county.upper() not in wanted:
+            continue
+        for file in sorted(files):
+            if file.endswith('.json'):
+                partitions.append(("json", os.path.join(root, file), county))
+    return partitions
+
+def load_partition(partition):
+    if partition[0] == "store":
+        _, path, county, first, last = partition
+        return FilterEngine.from_store(path, county=county, day_from=first, day_to=last)
+    _, path, county = partition
+    try:
+        data = load_json(path)
+    except (OSError, ValueError) as e:
+        print(f"Error reading {path}: {e}", file=sys.stderr)
+        return None
+    if not isinstance(data, dict) or 'auction_items' not in data or 'auction_date' not in data:
+        return None
+    return FilterEngine.from_datasets([(county, data)])
+
+def filter_partition(task):
+    """
+    Load and filter one partition; runs in a worker process
+
+    Returns:
+        (items scanned, matching rows as tuples of OUTPUT_COLUMNS)
+    """
+    partition, rules = task
+    engine = load_partition(partition)
+    if engine is None or engine.frame.empty:
+        return 0, []
+    filtered = engine.filter(**rules)
+    rows = list(filtered.reindex(columns=list(OUTPUT_COLUMNS)).itertuples(index=False, name=None))
+    return len(engine.frame), rows
+
+class StreamingFilter:
+    """
+    Filter partitions (store months or JSON files) in a process pool.
+
+    Every partition is loaded and filtered by a worker, and its matching rows
+    are handed to the writer in partition order as soon as they are ready.
+    At most `window` partitions are in flight, so memory stays flat however
+    much history there is.
+    """
+
+    def __init__(self, workers=None, window=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.window = window or self.workers * 2
+        self.scanned = 0
+        self.matched = 0
+
+    def run(self, partitions, rules, writer):
+        tasks = iter((partition, rules) for partition in partitions)
+        if self.workers == 1:
+            # No pool to start for a single worker
+            for task in tasks:
+                self.write(filter_partition(task), writer)
+            return self.matched
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            pending = deque()
+            for task in tasks:
+                pending.append(executor.submit(filter_partition, task))
+                if len(pending) >= self.window:
+                    self.write(pending.popleft().result(), writer)
+            while pending:
+                self.write(pending.popleft().result(), writer)
+        return self.matched
+
+    def write(self, result, writer):
+        scanned, rows = result
+        self.scanned += scanned
+        self.matched += len(rows)
+        if rows:
+            writer.write_rows(rows)
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from lib import metrics
+from lib.rate_limit import RateLimiter, THROTTLE_STATUSES, host_key, pool_key
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+FACTORY = None
+_FACTORY_LOCK = threading.Lock()
+
+# Rate limiter key of the request an adapter is sending on this thread; urllib3 retries it
+# on the same thread, so ObservedRetry reads it from here
+_SENDING = threading.local()
+
+def sending_host():
+    """Host key of the request being sent on this thread, or None"""
+    return getattr(_SENDING, 'host', None)
+
+class SharedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that survives session.close() so its pools can be reused."""
+
+    def request_host(self, request):
+        """Host whose rate limit the request counts against"""
+        return host_key(request.url)
+
+    def send(self, request, *args, **kwargs):
+        _SENDING.host = self.request_host(request)
+        try:
+            return super().send(request, *args, **kwargs)
+        finally:
+            _SENDING.host = None
+
+    def close(self):
+        pass
+
+    def shutdown(self):
+        super().close()
+
+class ObservedRetry(Retry):
+    """
+    Retry that keeps the rate limiter in the loop.
+
+    Every 429/503 is reported here, the ones it retries away as well as the
+    last one, so the limiter hears about each throttled attempt exactly once.
+    A retried attempt also takes a token from its host's bucket, after the
+    backoff, like any other request.
+    """
+    limiter = None
+    host = None
+
+    def new(self, **kw):
+        retry = super().new(**kw)
+        retry.limiter = self.limiter
+        retry.host = self.host
+        return retry
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        # The host the request was meant for, which isn't the pool's when it goes to a replay server
+        host = sending_host() or (pool_key(_pool.host, _pool.port) if _pool is not None else None)
+        if self.limiter is not None and response is not None and host is not None \
+                and response.status in THROTTLE_STATUSES:
+            self.limiter.throttle(host, response.status, response.headers.get('Retry-After'))
+        retry = super().increment(method, url, response, error, _pool, _stacktrace)
+        if host is not None:
+            retry.host = host
+        return retry
+
+    def sleep(self, response=None):
+        super().sleep(response)
+        if self.limiter is not None and self.host is not None:
+            delay = self.limiter.bucket(self.host).reserve()
+            if delay > 0:
+                time.sleep(delay)
+
+def was_retried(response):
+    """True when urllib3 retried the request before this response (its latency includes the backoff)"""
+    retries = getattr(getattr(response, 'raw', None), 'retries', None)
+    return bool(retries is not None and retries.history)
+
+class TimeoutMixin:
+    """Apply the factory's timeout to every request that doesn't set one."""
+    timeout = None
+
+    def request(self, *args, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return super().request(*args, **kwargs)
+
+class RateLimitMixin:
+    """
+    Wait for the host's token bucket before every request and report the response to it.
+
+    Throttled attempts are reported by ObservedRetry, so only the latency
+    of a response goes to the bucket here.
+    """
+    rate_limiter = None
+
+    def request(self, method, url, *args, **kwargs):
+        if self.rate_limiter is None:
+            return super().request(method, url, *args, **kwargs)
+        self.rate_limiter.acquire(url)
+        started = time.monotonic()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except Exception:
+            self.rate_limiter.observe_error(url)
+            raise
+        self.rate_limiter.observe(url, response, time.monotonic() - started, retried=was_retried(response))
+        return response
+
+class AsyncRateLimitMixin:
+    """RateLimitMixin for AsyncSession, whose request() returns an awaitable."""
+    rate_limiter = None
+
+    def request(self, method, url, *args, **kwargs):
+        if self.rate_limiter is None:
+            return super().request(method, url, *args, **kwargs)
+        return self._limited_request(method, url, *args, **kwargs)
+
+    async def _limited_request(self, method, url, *args, **kwargs):
+        await self.rate_limiter.async_acquire(url)
+        started = time.monotonic()
+        try:
+            response = await super().request(method, url, *args, **kwargs)
+        except Exception:
+            self.rate_limiter.observe_error(url)
+            raise
+        self.rate_limiter.observe(url, response, time.monotonic() - started, retried=was_retried(response))
+        return response
+
+class AsyncSession(requests.Session):
+    """
+    Session whose request() runs in a thread pool and returns an awaitable.
+
+    Works like requests_html's AsyncHTMLSession, without importing
+    requests_html (pyppeteer, websockets, bs4) on every run; Chromium is
+    only needed for the render fallback, which loads it itself.
+    """
+
+    def __init__(self, loop=None, workers=None):
+        super().__init__()
+        self.loop = loop or asyncio.get_event_loop()
+        self.thread_pool = ThreadPoolExecutor(max_workers=workers)
+
+    def request(self, *args, **kwargs):
+        return self.loop.run_in_executor(self.thread_pool, partial(super().request, *args, **kwargs))
+
+    async def close(self):
+        super().close()
+        self.thread_pool.shutdown(wait=False)
+
+class PooledSession(RateLimitMixin, TimeoutMixin, requests.Session):
+    pass
+
+class PooledAsyncSession(AsyncRateLimitMixin, TimeoutMixin, AsyncSession):
+    pass
+
+def count_response(response, *args, **kwargs):
+    """Response hook: count requests by host and status, and the bytes downloaded"""
+    host = host_key(response.url)
+    metrics.incr("http_requests", host=host, status=response.status_code)
+    metrics.incr("bytes_downloaded", len(response.content or b""), host=host)
+
+class SessionFactory:
+    """
+    Build sessions that share one keep-alive connection pool.
+
+    Every session mounts the same adapter, so a host's connections are
+    reused across the calendar, auction and realtor.com requests of a run.
+    Requests that get a 429/5xx are retried with exponential backoff
+    (honoring Retry-After) and every request gets a default timeout.
+    Requests are paced per host by the factory's RateLimiter.
+    """
+
+    def __init__(self, pool_maxsize=4, pool_connections=32, retries=3, backoff_factor=0.5,
+                 timeout=(10, 30), rate_limiter=None, record=None, replay=None):
+        """
+        Args:
+            pool_maxsize: Connections kept alive per host
+            pool_connections: Number of hosts whose pools are kept
+            retries: Retries on connection errors and 429/5xx responses
+            backoff_factor: Backoff between retries is backoff_factor * 2 ** (retry - 1) seconds
+            timeout: Default (connect, read) timeout in seconds
+            rate_limiter: RateLimiter pacing the requests, False for none (default: a RateLimiter())
+            record: ReplayArchive path to save every response to
+            replay: URL of a replay server (replay.py serve) to send every request to instead
+        """
+        self.timeout = timeout
+        self.rate_limiter = RateLimiter() if rate_limiter is None else (rate_limiter or None)
+        retry = ObservedRetry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        retry.limiter = self.rate_limiter
+        adapter_options = dict(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                               max_retries=retry, pool_block=False)
+        self.archive = None
+        if record:
+            from lib.replay import RecordingAdapter, ReplayArchive
+            self.archive = ReplayArchive(record)
+            self.adapter = RecordingAdapter(self.archive, **adapter_options)
+        elif replay:
+            from lib.replay import ReplayAdapter
+            self.adapter = ReplayAdapter(replay, **adapter_options)
+        else:
+            self.adapter = SharedHTTPAdapter(**adapter_options)
+        self._session = None
+        self._lock = threading.Lock()
+
+    def configure(self, session):
+        session.timeout = self.timeout
+        session.rate_limiter = self.rate_limiter
+        session.hooks['response'].append(count_response)
+        session.mount('http://', self.adapter)
+        session.mount('https://', self.adapter)
+        return session
+
+    def new_session(self):
+        """A new Session (own cookie jar) on the shared pool."""
+        return self.configure(PooledSession())
+
+    def new_async_session(self, workers=None):
+        """A new AsyncSession (own cookie jar) on the shared pool."""
+        return self.configure(PooledAsyncSession(workers=workers))
+
+    def session(self):
+        """The Session shared by the whole run."""
+        with self._lock:
+            if self._session is None:
+                self._session = self.new_session()
+            return self._session
+
+    def stats(self):
+        """Connections opened and requests sent, per host."""
+        stats = {}
+        pools = self.adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            name = pool.host if pool.port in (None, 80, 443) else f"{pool.host}:{pool.port}"
+            host = stats.setdefault(name, {"connections": 0, "requests": 0})
+            host["connections"] += pool.num_connections
+            host["requests"] += pool.num_requests
+        return stats
+
+    def summary(self):
+        lines = ["HTTP connection pool:"]
+        stats = self.stats()
+        if not stats:
+            lines.append("  no requests")
+        for host, counts in sorted(stats.items()):
+            reused = max(counts["requests"] - counts["connections"], 0)
+            lines.append(f"  {host}: {counts['requests']} requests, {counts['connections']} connects, {reused} reused")
+        if self.rate_limiter is not None:
+            lines.append(self.rate_limiter.summary())
+        return "\n".join(lines)
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+        self.adapter.shutdown()
+        if self.archive is not None:
+            self.archive.close()
+
+def configure(**kwargs):
+    """Replace the run's session factory, e.g. with CLI timeouts."""
+    global FACTORY
+    with _FACTORY_LOCK:
+        FACTORY = SessionFactory(**kwargs)
+    return FACTORY
+
+def get_factory():
+    global FACTORY
+    with _FACTORY_LOCK:
+        if FACTORY is None:
+            FACTORY = SessionFactory()
+        return FACTORY
+
+def get_session():
+    """The Session shared by fc.py, ListingScrapper and RealtorData."""
+    return get_factory().session()
@@ -0,0 +1,130 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+DEFAULT_PATH = "data/jobs.sqlite"
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+class JobQueue:
+    """
+    Durable queue of (county, auction date) scrape jobs in SQLite.
+
+    A job goes pending -> running -> done, or failed with the error and the
+    number of attempts. Jobs left running by a run that crashed go back to
+    pending on recover(), so the next run picks up where it stopped and
+    never redoes a date that is done.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "county TEXT NOT NULL, auction_date TEXT NOT NULL, status TEXT NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, error TEXT, updated_at TEXT NOT NULL, "
+            "PRIMARY KEY (county, auction_date))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)")
+        self._conn.commit()
+
+    def _now(self):
+        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    def recover(self):
+        """Put jobs a crashed run left running back to pending; returns how many"""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE status = ?", (PENDING, self._now(), RUNNING)
+            ).rowcount
+
+    def add(self, county, date):
+        """
+        Queue a date; a done job is queued again, any other is left alone
+
+        A failed job keeps its attempts: claimable() hands it out again while
+        it has attempts left, counting those of earlier runs.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (county, auction_date, status, attempts, updated_at) VALUES (?, ?, ?, 0, ?) "
+                "ON CONFLICT (county, auction_date) DO UPDATE SET status = excluded.status, attempts = 0, "
+                "error = NULL, updated_at = excluded.updated_at WHERE jobs.status = ?",
+                (county, date, PENDING, self._now(), DONE),
+            )
+
+    def add_many(self, jobs):
+        """Queue many (county, date) jobs like add, in one transaction"""
+        now = self._now()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO jobs (county, auction_date, status, attempts, updated_at) VALUES (?, ?, ?, 0, ?) "
+                "ON CONFLICT (county, auction_date) DO UPDATE SET status = excluded.status, attempts = 0, "
+                "error = NULL, updated_at = excluded.updated_at WHERE jobs.status = ?",
+                [(county, date, PENDING, now, DONE) for county, date in jobs],
+            )
+
+    def claimable(self, max_attempts=3, counties=None):
+        """(county, date) of pending jobs and of failed ones with attempts left"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT county, auction_date FROM jobs WHERE status = ? OR (status = ? AND attempts < ?) "
+                "ORDER BY county, auction_date",
+                (PENDING, FAILED, max_attempts),
+            ).fetchall()
+        return [tuple(row) for row in rows if counties is None or row[0] in counties]
+
+    def start(self, county, date):
+        self._set(county, date, RUNNING)
+
+    def done(self, county, date):
+        self._set(county, date, DONE)
+
+    def fail(self, county, date, error):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, error = ?, updated_at = ? "
+                "WHERE county = ? AND auction_date = ?",
+                (FAILED, str(error), self._now(), county, date),
+            )
+
+    def _set(self, county, date, status):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = NULL, updated_at = ? WHERE county = ? AND auction_date = ?",
+                (status, self._now(), county, date),
+            )
+
+    def counts(self):
+        """Number of jobs by status"""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = {PENDING: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        counts.update(dict(rows))
+        return counts
+
+    def failures(self):
+        """(county, date, attempts, error) of every failed job"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT county, auction_date, attempts, error FROM jobs WHERE status = ? ORDER BY county, auction_date",
+                (FAILED,),
+            ).fetchall()
+        return [tuple(row) for row in rows]
+
+    def summary(self):
+        counts = self.counts()
+        return (f"Jobs: {counts[DONE]} done, {counts[FAILED]} failed, "
+                f"{counts[PENDING]} pending, {counts[RUNNING]} running")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,151 @@
+import os
+import sqlite3
+import threading
+import time
+
+from lib import metrics
+from lib.address import canonical_address, canonical_parcel_id
+
+DEFAULT_PATH = "data/match_index.sqlite"
+
+# PRAGMA user_version of the index: 0 keyed parcels by parcel ID alone, 1 by (county, parcel ID)
+KEY_VERSION = 1
+
+INDEX = None
+_INDEX_LOCK = threading.Lock()
+
+def parcel_id_key(county, parcel_id):
+    """(county, canonical parcel ID), or None without either: the same parcel ID can exist in two counties"""
+    parcel_key = canonical_parcel_id(parcel_id)
+    if not county or not parcel_key:
+        return None
+    return (county.upper(), parcel_key)
+
+class MatchIndex:
+    """
+    Known realtor.com links by (county, parcel ID) and by canonical address.
+
+    Unlike the suggest cache, which remembers API answers for a while,
+    the index only holds matches and keeps them: a parcel's realtor.com
+    page doesn't move. It is filled from the links already in the store
+    and the suggest cache, and by every new match, so a property seen
+    before never goes to the suggest API again, however its address is
+    written.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self.parcel_hits = 0
+        self.address_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] < KEY_VERSION:
+            # Parcel IDs are only unique within a county, and the old rows don't say which one;
+            # the index starts over and configure() fills it again from the store and the cache
+            self._conn.execute("DROP TABLE IF EXISTS parcels")
+            self._conn.execute("DROP TABLE IF EXISTS addresses")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS parcels (county TEXT NOT NULL, parcel_id TEXT NOT NULL, link TEXT NOT NULL, "
+            "updated REAL NOT NULL, PRIMARY KEY (county, parcel_id))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS addresses (address TEXT PRIMARY KEY, link TEXT NOT NULL, updated REAL NOT NULL)"
+        )
+        self._conn.execute(f"PRAGMA user_version = {KEY_VERSION}")
+        self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return sum(self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                       for table in ("parcels", "addresses"))
+
+    def get(self, parcel_id=None, address=None, county=None):
+        """Link of the county's parcel, else of the address, else None; a parcel ID without a county isn't used"""
+        parcel_key = parcel_id_key(county, parcel_id)
+        address_key = canonical_address(address)
+        with self._lock:
+            if parcel_key:
+                row = self._conn.execute("SELECT link FROM parcels WHERE county = ? AND parcel_id = ?",
+                                         parcel_key).fetchone()
+                if row is not None:
+                    self.parcel_hits += 1
+                    metrics.incr("index_hits", key="parcel")
+                    return row[0]
+            if address_key:
+                row = self._conn.execute("SELECT link FROM addresses WHERE address = ?", (address_key,)).fetchone()
+                if row is not None:
+                    self.address_hits += 1
+                    metrics.incr("index_hits", key="address")
+                    if parcel_key:
+                        # Found by address: remember the parcel as well
+                        self._put(parcel_key, None, row[0])
+                        self._conn.commit()
+                    return row[0]
+            self.misses += 1
+            metrics.incr("index_misses")
+            return None
+
+    def put(self, link, parcel_id=None, address=None, county=None):
+        """Remember a match; a link of None (no match) isn't kept"""
+        if not link:
+            return
+        with self._lock:
+            self._put(parcel_id_key(county, parcel_id), canonical_address(address), link)
+            self._conn.commit()
+
+    def _put(self, parcel_key, address_key, link):
+        now = time.time()
+        if parcel_key:
+            self._conn.execute("INSERT OR REPLACE INTO parcels (county, parcel_id, link, updated) VALUES (?, ?, ?, ?)",
+                               (*parcel_key, link, now))
+        if address_key:
+            self._conn.execute("INSERT OR REPLACE INTO addresses (address, link, updated) VALUES (?, ?, ?)",
+                               (address_key, link, now))
+
+    def add_many(self, matches):
+        """Remember many (county, parcel ID, address, link) matches in one transaction; returns how many were kept"""
+        added = 0
+        with self._lock, self._conn:
+            for county, parcel_id, address, link in matches:
+                if link:
+                    self._put(parcel_id_key(county, parcel_id), canonical_address(address), link)
+                    added += 1
+        return added
+
+    def build(self, store=None, cache=None):
+        """Fill the index from the links of an AuctionStore and a SuggestCache; returns the matches added"""
+        added = 0
+        if cache is not None:
+            added += self.add_many((None, None, address, link) for address, link in cache.links())
+        if store is not None:
+            # Added last, so a link saved with an item wins over the cache's
+            added += self.add_many(store.links())
+        return added
+
+    def summary(self):
+        return (f"Match index: {self.parcel_hits} parcel hits, {self.address_hits} address hits, "
+                f"{self.misses} misses, {len(self)} keys")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def configure(path=DEFAULT_PATH, store=None, cache=None):
+    """Open another index; an empty one is built from the store and cache given"""
+    global INDEX
+    with _INDEX_LOCK:
+        INDEX = MatchIndex(path)
+        if store is not None or cache is not None:
+            if not len(INDEX):
+                INDEX.build(store, cache)
+    return INDEX
+
+def get_index():
+    global INDEX
+    with _INDEX_LOCK:
+        if INDEX is None:
+            INDEX = MatchIndex()
+        return INDEX
@@ -0,0 +1,177 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+
+METRICS = None
+_METRICS_LOCK = threading.Lock()
+
+def label_text(labels):
+    return "{" + ",".join(f'{name}="{value}"' for name, value in labels) + "}" if labels else ""
+
+class Metrics:
+    """
+    Timers and counters of one run.
+
+    A timer adds up the calls and the wall-clock time of a stage (calendar
+    fetch, page load, render, AJAX call, parse, save, realtor.com lookup);
+    a counter adds up anything else (bytes downloaded, items parsed, cache
+    hits), optionally split by labels such as the host. Stages listed in
+    profile_stages also run under cProfile.
+    """
+
+    def __init__(self, profile_stages=()):
+        self.started = time.perf_counter()
+        self.timers = {}
+        self.counters = {}
+        self.profile_stages = set(profile_stages)
+        self.profile_stats = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def timer(self, stage):
+        """Time the block as one call of the stage"""
+        profiler = self._start_profile() if stage in self.profile_stages else None
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.perf_counter() - started)
+            if profiler is not None:
+                self._stop_profile(profiler)
+
+    def _start_profile(self):
+        # One profiler per block, since a profiler only sees the thread that enabled it
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active
+            return None
+        return profiler
+
+    def _stop_profile(self, profiler):
+        profiler.disable()
+        with self._lock:
+            if self.profile_stats is None:
+                self.profile_stats = pstats.Stats(profiler)
+            else:
+                self.profile_stats.add(profiler)
+
+    def add_time(self, stage, seconds):
+        with self._lock:
+            timer = self.timers.get(stage)
+            if timer is None:
+                timer = self.timers[stage] = {"calls": 0, "seconds": 0.0, "max": 0.0}
+            timer["calls"] += 1
+            timer["seconds"] += seconds
+            timer["max"] = max(timer["max"], seconds)
+
+    def incr(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def count(self, name):
+        """Total of a counter over all its labels"""
+        with self._lock:
+            return sum(value for (counter, _), value in self.counters.items() if counter == name)
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "elapsed_seconds": time.perf_counter() - self.started,
+                "timers": {stage: dict(timer) for stage, timer in self.timers.items()},
+                "counters": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(self.counters.items())
+                ],
+            }
+
+    def summary(self):
+        data = self.to_dict()
+        elapsed = data["elapsed_seconds"]
+        lines = [f"Run metrics ({elapsed:.1f}s wall clock; stages that run concurrently can add up to more):",
+                 f"  {'stage':<16} {'calls':>7} {'total s':>9} {'avg ms':>9} {'max ms':>9} {'% wall':>7}"]
+        for stage, timer in sorted(data["timers"].items(), key=lambda entry: -entry[1]["seconds"]):
+            average = timer["seconds"] / timer["calls"] * 1000 if timer["calls"] else 0.0
+            share = timer["seconds"] / elapsed * 100 if elapsed else 0.0
+            lines.append(f"  {stage:<16} {timer['calls']:>7} {timer['seconds']:>9.2f} {average:>9.1f} "
+                         f"{timer['max'] * 1000:>9.1f} {share:>6.0f}%")
+        if not data["timers"]:
+            lines.append("  no stages timed")
+        for counter in data["counters"]:
+            labels = label_text(sorted(counter["labels"].items()))
+            lines.append(f"  {counter['name']}{labels}: {counter['value']}")
+        return "\n".join(lines)
+
+    def prometheus(self, prefix="fc"):
+        """The metrics in the Prometheus text format (for node_exporter's textfile collector)"""
+        data = self.to_dict()
+        lines = [
+            f"# TYPE {prefix}_run_seconds gauge",
+            f"{prefix}_run_seconds {data['elapsed_seconds']:.6f}",
+            f"# TYPE {prefix}_stage_seconds_total counter",
+        ]
+        for stage, timer in sorted(data["timers"].items()):
+            lines.append(f'{prefix}_stage_seconds_total{{stage="{stage}"}} {timer["seconds"]:.6f}')
+        lines.append(f"# TYPE {prefix}_stage_calls_total counter")
+        for stage, timer in sorted(data["timers"].items()):
+            lines.append(f'{prefix}_stage_calls_total{{stage="{stage}"}} {timer["calls"]}')
+        typed = set()
+        for counter in data["counters"]:
+            name = f"{prefix}_{counter['name']}_total"
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}{label_text(sorted(counter['labels'].items()))} {counter['value']}")
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path):
+        self._write(path, json.dumps(self.to_dict(), indent=4))
+
+    def write_prometheus(self, path):
+        self._write(path, self.prometheus())
+
+    def _write(self, path, text):
+        # Written to a temporary file first, so a collector never reads half a file
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+    def write_profile(self, path, top=20):
+        """Save the cProfile stats (pstats format) and return the top functions by cumulative time"""
+        if self.profile_stats is None:
+            return ""
+        with self._lock:
+            self.profile_stats.dump_stats(path)
+        out = io.StringIO()
+        pstats.Stats(path, stream=out).sort_stats("cumulative").print_stats(top)
+        return out.getvalue()
+
+def configure(profile_stages=()):
+    """Start a fresh set of metrics, e.g. with stages to profile"""
+    global METRICS
+    with _METRICS_LOCK:
+        METRICS = Metrics(profile_stages)
+    return METRICS
+
+def get_metrics():
+    global METRICS
+    with _METRICS_LOCK:
+        if METRICS is None:
+            METRICS = Metrics()
+        return METRICS
+
+def timer(stage):
+    return get_metrics().timer(stage)
+
+def incr(name, value=1, **labels):
+    get_metrics().incr(name, value, **labels)
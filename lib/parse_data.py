@@ -1,7 +1,19 @@
 import json
 import re
-from typing import List, Dict, Any
-from lib.realtor_data import RealtorData
+from typing import List, Dict, Any, Optional, Tuple
+from lib.auction_record import AuctionRecord, parse_auction_date
+from lib.counties import CountyProfile, get_profile
+
+# Start of every auction item in retHTML; the item runs up to the first spacer after it
+ITEM_START_PATTERN = re.compile(r'<div id=\"AITEM_([^"]*)\"')
+ITEM_END_MARKER = '@E_ITEM_SPACER">&nbsp;'
+TAG_PATTERN = re.compile(r'<.*?>')
+# The AUCTION_STATS block at the top of an item, the same in every layout: the first
+# label/value pair ("Auction Starts", "Auction Sold", "Auction Status") and the sold amount
+STATUS_PATTERN = re.compile(r'ASTAT_MSGA ASTAT_LBL">(.*?)@B.*?ASTAT_MSGB Astat_DATA">(.*?)@B', re.DOTALL)
+SOLD_AMOUNT_PATTERN = re.compile(r'ASTAT_MSGD Astat_DATA">(.*?)@B')
+# Status of the labels that don't carry it in their value
+STATUS_LABELS = {"Auction Starts": "Scheduled", "Auction Sold": "Sold"}
 
 class ParseData:
     def parse_auction_data(self, raw_data: str, county: str = "default") -> List[Dict[str, Any]]:
@@ -14,121 +26,120 @@ class ParseData:
         Returns:
             List of dictionaries containing structured auction information
         """
-        # Parse the JSON
+        payload = self.load_payload(raw_data)
+        if payload is None:
+            return []
+        html_content, auction_ids = payload
+        return self.parse_items(self.index_items(html_content), auction_ids, county)
+
+    def load_payload(self, raw_data: str) -> Optional[Tuple[str, List[str]]]:
+        """
+        Read retHTML and the rlist auction IDs from the raw AJAX response
+        
+        Returns:
+            (retHTML, auction IDs), or None when the response isn't valid JSON
+        """
         try:
             data = json.loads(raw_data)
             html_content = data.get("retHTML", "")
             auction_ids = data.get("rlist", "").split(",")
-            if not auction_ids:
-                return []
-
-        except json.JSONDecodeError:
+        except (json.JSONDecodeError, TypeError):
             print("Error: Invalid JSON data")
-            return []
-        
-        # Find all auction items
+            return None
+        return html_content, auction_ids
+
+    def parse_items(self, item_index: Dict[str, str], auction_ids: List[str], county: str = "default") -> List[Dict[str, Any]]:
+        """Parse the indexed items of the given IDs, in the order of the IDs"""
+        profile = get_profile(county)
         auction_items = []
         
         for auction_id in auction_ids:
-            # Find the div with the specific ID
-            pattern = rf'<div id=\"AITEM_{auction_id}\".*?@E_ITEM_SPACER\">&nbsp;'
-            match = re.search(pattern, html_content, re.DOTALL)
+            item_html = item_index.get(auction_id)
             
-            if not match:
+            if item_html is None:
                 continue
-                
-            item_html = match.group(0)
-            
-            if county.lower() == "orange":
-                auction_info = self.parse_orange_county_item(item_html, auction_id)
-            else:
-                auction_info = self.parse_default_item(item_html, auction_id)
             
-            auction_items.append(auction_info)
+            auction_items.append(self.parse_item(item_html, auction_id, profile))
         
         return auction_items
 
-    def parse_default_item(self, item_html: str, auction_id: str) -> Dict[str, Any]:
-        """Parse auction item using default format"""
-        auction_info = {
-            "auction_id": auction_id,
-            "auction_type": self.extract_field(item_html, "Auction Type:", "@CAD_DTA\">", "@G"),
-            "case_number": self.extract_field(item_html, "Case #:", "@CAD_DTA\">", "@G").strip(),
-            "final_judgment_amount": self.extract_field(item_html, "Final Judgment Amount:", "@CAD_DTA\">", "@G"),
-            "parcel_id": self.extract_field(item_html, "Parcel ID:", "@CAD_DTA\">", "@G").strip(),
-            "property_address": self.extract_property_address(item_html),
-            "assessed_value": self.extract_field(item_html, "Assessed Value:", "@CAD_DTA\">", "@G"),
-            "plaintiff_max_bid": self.extract_field(item_html, "Plaintiff Max Bid:", "@CAD_DTA ASTAT_MSGPB\">", "@G")
-        }
+    def parse_records(self, item_index: Dict[str, str], auction_ids: List[str], county: str = "default",
+                      auction_date: Optional[str] = None) -> List[AuctionRecord]:
+        """Parse the indexed items of the given IDs into typed records"""
+        # One date object shared by all records of the day
+        auction_date = parse_auction_date(auction_date)
+        return [AuctionRecord.from_item(item, auction_date) for item in self.parse_items(item_index, auction_ids, county)]
+
+    def index_items(self, html_content: str) -> Dict[str, str]:
+        """
+        Split retHTML into auction items with a single scan
         
-        # Clean up case number and parcel ID (remove HTML tags)
-        auction_info["case_number"] = re.sub(r'<.*?>', '', auction_info["case_number"]).strip()
-        auction_info["parcel_id"] = re.sub(r'<.*?>', '', auction_info["parcel_id"]).strip()
+        Args:
+            html_content: retHTML from the AJAX response
+        
+        Returns:
+            Dictionary mapping auction ID to the HTML of that item
+        """
+        item_index = {}
+        for match in ITEM_START_PATTERN.finditer(html_content):
+            auction_id = match.group(1)
+            # The first occurrence of an ID wins, same as a search from the top
+            if auction_id in item_index:
+                continue
+            end = html_content.find(ITEM_END_MARKER, match.end())
+            if end == -1:
+                # No spacer left, so none of the remaining items is complete
+                break
+            item_index[auction_id] = html_content[match.start():end + len(ITEM_END_MARKER)]
+        return item_index
+
+    def parse_item(self, item_html: str, auction_id: str, profile: CountyProfile) -> Dict[str, Any]:
+        """Parse one auction item with the county's precompiled patterns"""
+        auction_info = {"auction_id": auction_id}
+        for field, pattern, strip_tags in profile.fields:
+            match = pattern.search(item_html)
+            value = match.group(1).strip() if match else ""
+            if strip_tags:
+                # Case number and parcel ID have a link inside
+                value = TAG_PATTERN.sub('', value).strip()
+            auction_info[field] = value
+        
+        # The city and zip are in the row after the street
+        auction_info["property_address"] = profile.property_address(item_html, auction_info["property_address"])
+        auction_info["auction_status"], auction_info["sold_amount"] = self.parse_status(item_html)
         
         return auction_info
+
+    def parse_status(self, item_html: str) -> Tuple[str, str]:
+        """(status, sold amount) from the AUCTION_STATS block, e.g. ("Scheduled", ""), ("Sold", "$150,100.00")
+        or ("Canceled per County", "")"""
+        match = STATUS_PATTERN.search(item_html)
+        if not match:
+            return "", ""
+        label, value = match.group(1).strip(), match.group(2).strip()
+        status = STATUS_LABELS.get(label, value if label == "Auction Status" else label)
+        sold_amount = ""
+        if status == "Sold":
+            sold = SOLD_AMOUNT_PATTERN.search(item_html, match.end())
+            sold_amount = sold.group(1).strip() if sold else ""
+        return status, sold_amount
+
+    def parse_default_item(self, item_html: str, auction_id: str) -> Dict[str, Any]:
+        """Parse auction item using default format"""
+        return self.parse_item(item_html, auction_id, get_profile("default"))
     
     def parse_orange_county_item(self, item_html: str, auction_id: str) -> Dict[str, Any]:
         """Parse auction item using Orange County format"""
-        # Extract case number which has link inside
-        case_number = self.extract_field(item_html, "Case #:", "@AAD_DTA\">", "@B")
-        case_number = re.sub(r'<.*?>', '', case_number).strip()
-        
-        # Extract parcel ID which has link inside
-        parcel_id = self.extract_field(item_html, "Parcel ID:", "@AAD_DTA\">", "@B")
-        parcel_id = re.sub(r'<.*?>', '', parcel_id).strip()
-        
-        # Extract property address (which is in two parts in Orange County format)
-        address1 = self.extract_field(item_html, "Property Address:", "@CAD_DTA\">", "@B").strip()
-        
-        # Try to find the city and zip
-        city_zip_pattern = r'@CAD_LBL\"[^>]*>@B<div tabindex=\"0\"@CAD_DTA\">(.*?), (\d+)@B'
-        city_zip_match = re.search(city_zip_pattern, item_html)
-        
-        if city_zip_match:
-            city = city_zip_match.group(1).strip()
-            zip_code = city_zip_match.group(2).strip()
-            property_address = f"{address1}, {city}, FL {zip_code}"
-        else:
-            property_address = address1
-        
-        auction_info = {
-            "auction_id": auction_id,
-            "case_number": case_number,
-            "final_judgment_amount": self.extract_field(item_html, "Final Judgment Amount:", "@CAD_DTA\">", "@B"),
-            "parcel_id": parcel_id,
-            "property_address": property_address,
-            "assessed_value": self.extract_field(item_html, "Assessed Value:", "@CAD_DTA\">", "@B"),
-            "plaintiff_max_bid": self.extract_field(item_html, "Plaintiff Max Bid:", "@CAD_DTA ASTAT_MSGPB\">", "@B")
-        }
-        
-        return auction_info
+        return self.parse_item(item_html, auction_id, get_profile("orange"))
     
-    def extract_field(self, html: str, field_label: str, start_marker: str, end_marker: str) -> str:
-        """Extract a specific field from the HTML-like content"""
-        pattern = rf'{field_label}.*?{start_marker}(.*?){end_marker}'
-        match = re.search(pattern, html, re.DOTALL)
-        if match:
-            return match.group(1).strip()
-        return ""
-    
-    def extract_property_address(self, html: str) -> str:
-        """Extract and combine property address parts"""
-        address1 = self.extract_field(html, "Property Address:", "@CAD_DTA\">", "@G")
-        
-        # Find the city, state, zip part - it's in a different format
-        pattern = r'@CAD_LBL\" scope=\"row\">@F tabindex=\"0\" @CAD_DTA\">(.*?), FL-\s*(\d+)@G'
-        match = re.search(pattern, html)
-        
-        if match:
-            city = match.group(1).strip()
-            zip_code = match.group(2).strip()
-            return f"{address1}, {city}, FL-{zip_code}"
-        
-        return address1
-    
-    def display_auction_items(self, auction_items: List[Dict[str, Any]]) -> None:
-        """Print auction items in a readable format"""
+    def display_auction_items(self, auction_items: List[Any]) -> None:
+        """Print auction items (dictionaries or AuctionRecords) in a readable format"""
         for i, item in enumerate(auction_items, 1):
+            if isinstance(item, AuctionRecord):
+                item = item.to_dict()
+                for key in ("final_judgment_amount", "assessed_value"):
+                    if item[key] is not None:
+                        item[key] = f"${item[key]:,.2f}"
             # print(f"\nProperty {i} (ID: {item['auction_id']})")
             print("." * 25)
             print(f"Case #: {item['case_number']}")
@@ -136,6 +147,8 @@ class ParseData:
             print(f"Final Judgment Amount: {item['final_judgment_amount']}")
             print(f"Assessed Value: {item['assessed_value']}")
             print(f"Property Address: {item['property_address']}")
+            if item.get('auction_status'):
+                print(f"Status: {item['auction_status']}")
 
     # def parse_and_display_auction_data(self, raw_data):
     #     # Example usage
@@ -149,13 +162,7 @@ class ParseData:
     #     if auction_items:
     #         self.display_auction_items(auction_items)
 
-    def enrich_auction_items(self, auction_items):
-        realtor_data = RealtorData()
-        for item in auction_items:
-            link = realtor_data.get_property_address(item['property_address'])
-            if link:
-                item['realtor_link'] = link
-            else:
-                item['realtor_link'] = None
-        return auction_items
+    def enrich_auction_items(self, auction_items, workers=8, county=None):
+        from lib.enrich import Enricher
+        return Enricher(workers=workers).enrich(auction_items, county=county)
 
@@ -0,0 +1,216 @@
+import asyncio
+import sys
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+# Responses that mean "slow down"
+THROTTLE_STATUSES = (429, 503)
+
+def host_key(url):
+    """host, or host:port for a non-default port"""
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port not in (80, 443):
+        return f"{host}:{parts.port}"
+    return host
+
+def pool_key(host, port):
+    """Same key as host_key, from a urllib3 connection pool's host and port"""
+    host = (host or "").lower()
+    return f"{host}:{port}" if port and port not in (80, 443) else host
+
+def retry_after_seconds(value):
+    """Retry-After as seconds; it can be a number of seconds or an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError, IndexError):
+        return None
+
+class TokenBucket:
+    """
+    Token bucket of one host whose rate adapts to the host's responses.
+
+    The rate goes up by a fixed step for every fast, successful response
+    and is cut in half on a 429/503 (at most once per cooldown, so one
+    burst of throttled responses counts once); slow responses lower it a
+    little. Retry-After pauses the host for the time it asks for.
+    """
+
+    def __init__(self, host, rate=4.0, burst=4, min_rate=0.2, max_rate=20.0, increase=0.25,
+                 decrease=0.5, slow_decrease=0.9, target_latency=2.0, cooldown=1.0):
+        self.host = host
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.slow_decrease = slow_decrease
+        self.target_latency = target_latency
+        self.cooldown = cooldown
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.last_decrease = 0.0
+        self.first_request = None
+        self.last_request = None
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+        self.waited = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token; returns the seconds to wait before the request may go out"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(float(self.burst), self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Tokens may go negative: every caller queues up behind the earlier ones
+            self.tokens -= 1
+            delay = max(-self.tokens / self.rate, 0.0, self.paused_until - now)
+            if self.first_request is None:
+                self.first_request = now + delay
+            self.last_request = now + delay
+            self.requests += 1
+            self.waited += delay
+            return delay
+
+    def observe(self, status, latency, retried=False):
+        """
+        Adapt the rate to a response's latency
+
+        A 429/503 is left to throttle(), which the retry handling calls for
+        every throttled attempt, and the latency of a retried request, which
+        includes the backoff and Retry-After waits, says nothing about the host.
+        """
+        if status in THROTTLE_STATUSES or retried:
+            return
+        with self._lock:
+            if latency > self.target_latency:
+                self.rate = max(self.min_rate, self.rate * self.slow_decrease)
+            elif status < 500:
+                self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def observe_error(self):
+        """A connection error or timeout counts like a slow response"""
+        with self._lock:
+            self.errors += 1
+            self.rate = max(self.min_rate, self.rate * self.slow_decrease)
+
+    def throttle(self, status, retry_after=None):
+        """The host answered 429/503: back off, and pause for Retry-After when it is given"""
+        seconds = retry_after_seconds(retry_after)
+        with self._lock:
+            now = time.monotonic()
+            self.throttled += 1
+            if seconds:
+                self.paused_until = max(self.paused_until, now + seconds)
+            if now - self.last_decrease < self.cooldown:
+                return
+            self.last_decrease = now
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            rate = self.rate
+        wait = f", pausing {seconds:.1f}s (Retry-After)" if seconds else ""
+        print(f"Rate limit {self.host}: got {status}, backing off to {rate:.2f} req/s{wait}", file=sys.stderr)
+
+    def effective_rate(self):
+        """Requests per second actually sent between the first and the last request"""
+        if self.first_request is None or self.requests < 2:
+            return 0.0
+        elapsed = self.last_request - self.first_request
+        return (self.requests - 1) / elapsed if elapsed > 0 else 0.0
+
+class RateLimiter:
+    """
+    One adaptive TokenBucket per host.
+
+    Every request of the shared sessions waits for its host's bucket, so
+    hosts are throttled independently: a slow or throttling county only
+    slows itself down while the other hosts keep their own pace.
+    """
+
+    def __init__(self, rate=4.0, max_rate=20.0, host_rates=None, log_interval=30.0, **bucket_options):
+        """
+        Args:
+            rate: Starting requests per second of a host
+            max_rate: Highest rate a host can ramp up to
+            host_rates: Host -> starting rate, for hosts that need another one
+            log_interval: Seconds between rate lines in the run log (None for none)
+            bucket_options: Any other TokenBucket setting
+        """
+        self.rate = rate
+        self.max_rate = max_rate
+        self.host_rates = dict(host_rates or {})
+        self.log_interval = log_interval
+        self.bucket_options = bucket_options
+        self.buckets = {}
+        self._lock = threading.Lock()
+        self._last_log = time.monotonic()
+
+    def bucket(self, host):
+        with self._lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                rate = min(self.host_rates.get(host, self.rate), self.max_rate)
+                bucket = self.buckets[host] = TokenBucket(host, rate=rate, max_rate=self.max_rate,
+                                                          **self.bucket_options)
+            return bucket
+
+    def acquire(self, url):
+        """Block until a request to url may go out"""
+        delay = self.bucket(host_key(url)).reserve()
+        self.log_rates()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def async_acquire(self, url):
+        """Wait (without blocking the event loop) until a request to url may go out"""
+        delay = self.bucket(host_key(url)).reserve()
+        self.log_rates()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def log_rates(self):
+        """Print the current and effective rate of every host, at most once per log_interval"""
+        if self.log_interval is None:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_log < self.log_interval:
+                return
+            self._last_log = now
+            buckets = sorted(self.buckets.values(), key=lambda bucket: bucket.host)
+        rates = ", ".join(f"{bucket.host} {bucket.rate:.2f}/{bucket.effective_rate():.2f}" for bucket in buckets)
+        print(f"Request rates (allowed/effective req/s): {rates}")
+
+    def observe(self, url, response, latency, retried=False):
+        self.bucket(host_key(url)).observe(response.status_code, latency, retried)
+
+    def observe_error(self, url):
+        self.bucket(host_key(url)).observe_error()
+
+    def throttle(self, host, status, retry_after=None):
+        self.bucket(host).throttle(status, retry_after)
+
+    def summary(self):
+        lines = ["Request rates:"]
+        with self._lock:
+            buckets = sorted(self.buckets.values(), key=lambda bucket: bucket.host)
+        if not buckets:
+            lines.append("  no requests")
+        for bucket in buckets:
+            lines.append(
+                f"  {bucket.host}: {bucket.requests} requests, {bucket.effective_rate():.2f} req/s effective, "
+                f"{bucket.rate:.2f} req/s allowed, {bucket.throttled} throttled, {bucket.errors} errors, "
+                f"{bucket.waited:.1f}s waited in total"
+            )
+        return "\n".join(lines)
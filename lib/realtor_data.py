@@ -2,29 +2,35 @@
 
 import argparse
 import json
-from requests_html import HTMLSession
 import requests
-from bs4 import BeautifulSoup
 import sys
+from lib import http_session
+from lib import match_index
+from lib import suggest_cache
 
 import urllib.parse
 
 BASE_URL = "https://www.realtor.com/"
-SESSION = None
+# Returned by get_property_address when the lookup itself failed, as opposed to finding no match
+LOOKUP_FAILED = object()
+
 class RealtorData:
     """Scrape realtor.com for foreclosure listings."""
+    def __init__(self, cache=None, index=None):
+        self.cache = cache if cache is not None else suggest_cache.get_cache()
+        self.index = index if index is not None else match_index.get_index()
+
     def scrape_suggests(self, address):
         try:
-            global SESSION
-            SESSION = HTMLSession()
             # Send request to the website
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
             }
 
-            response = SESSION.get(f"https://parser-external.geo.moveaws.com/suggest?input={urllib.parse.quote(address, safe='')}&client_id=rdc-home&limit=10&area_types=address%2Cneighborhood%2Ccity%2Ccounty%2Cpostal_code%2Cstreet%2Cschool%2Cschool_district%2Cuniversity%2Cpark%2Cstate%2Cmlsid&lat=-1&long=-1", headers=headers)
+            response = http_session.get_session().get(f"https://parser-external.geo.moveaws.com/suggest?input={urllib.parse.quote(address, safe='')}&client_id=rdc-home&limit=10&area_types=address%2Cneighborhood%2Ccity%2Ccounty%2Cpostal_code%2Cstreet%2Cschool%2Cschool_district%2Cuniversity%2Cpark%2Cstate%2Cmlsid&lat=-1&long=-1", headers=headers)
             response.raise_for_status()
             # Parse the HTML content
+            from bs4 import BeautifulSoup
             soup2 = BeautifulSoup(response.text, 'html.parser')
             return soup2.text
         except requests.exceptions.RequestException as e:
@@ -48,10 +54,23 @@ class RealtorData:
             #print(f"Error extracting property ID: {e}", file=sys.stderr)
             return None
 
-    def get_property_address(self, address):
+    def get_property_address(self, address, parcel_id=None, county=None):
+        # A property matched before, by the county's parcel ID or by any spelling of its address
+        known = self.index.get(parcel_id, address, county)
+        if known is not None:
+            return known
+        cached = self.cache.get(address)
+        if cached is not suggest_cache.MISS:
+            self.index.put(cached, parcel_id, address, county)
+            return cached
         raw = self.scrape_suggests(address)
+        if not isinstance(raw, str):
+            # The request failed; don't remember that as "no match"
+            return LOOKUP_FAILED
         id = self.extract_property_id(raw)
-        if id is None:
-            return None
-        url = f"https://www.realtor.com/realestateandhomes-detail/M{id}"
+        url = None
+        if id is not None:
+            url = f"https://www.realtor.com/realestateandhomes-detail/M{id}"
+        self.cache.put(address, url)
+        self.index.put(url, parcel_id, address, county)
         return url
\ No newline at end of file
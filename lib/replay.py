@@ -0,0 +1,224 @@
+import json
+import os
+import random
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from lib.http_session import SharedHTTPAdapter
+from lib.rate_limit import host_key
+
+DEFAULT_PATH = "data/replay.sqlite"
+
+# Header that carries the original URL of a request sent to the stand-in server
+REPLAY_URL_HEADER = "X-Replay-Url"
+# Cache busters the client adds to the UPDATE/LOAD call
+VOLATILE_PARAMS = {"tx", "_"}
+# Response headers that don't describe the (decoded) body we keep
+SKIPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive", "date"}
+
+def request_key(method, url, referer=None):
+    """
+    Archive key of a request: method, host, path and the query without cache busters
+
+    The UPDATE/LOAD call has the same URL for every auction date (the date
+    lives in the server side session), so its key also gets the
+    AUCTIONDATE of the PREVIEW page it is sent from (the Referer).
+    """
+    parts = urlsplit(url)
+    params = sorted((name.lower(), value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+                    if name.lower() not in VOLATILE_PARAMS)
+    key = f"{method.upper()} {parts.netloc.lower()}{parts.path.lower()}?{urlencode(params)}"
+    if dict(params).get("zmethod", "").upper() == "UPDATE" and referer:
+        previewed = {name.lower(): value for name, value in parse_qsl(urlsplit(referer).query)}
+        key += f"#{previewed.get('auctiondate', '')}"
+    return key
+
+class ReplayArchive:
+    """
+    Recorded responses in one SQLite file, bodies zlib-compressed.
+
+    A key holds the last response recorded for it.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, url TEXT NOT NULL, status INTEGER NOT NULL, headers TEXT NOT NULL, "
+            "body BLOB NOT NULL, size INTEGER NOT NULL, recorded_at TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    def put(self, key, url, status, headers, body):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, url, status, headers, body, size, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, url, status, json.dumps(headers), zlib.compress(body, 6), len(body),
+                 datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+            )
+            self._conn.commit()
+
+    def get(self, key):
+        """(status, headers, body) or None"""
+        with self._lock:
+            row = self._conn.execute("SELECT status, headers, body FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1]), zlib.decompress(row[2])
+
+    def stats(self):
+        """Recorded responses and bytes (as recorded, and as stored) per host"""
+        with self._lock:
+            rows = self._conn.execute("SELECT url, size, length(body) FROM responses").fetchall()
+        hosts = {}
+        for url, size, stored in rows:
+            host = hosts.setdefault(urlsplit(url).netloc, {"responses": 0, "bytes": 0, "stored_bytes": 0})
+            host["responses"] += 1
+            host["bytes"] += size
+            host["stored_bytes"] += stored
+        return hosts
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class RecordingAdapter(SharedHTTPAdapter):
+    """Adapter that saves every response it receives to a ReplayArchive."""
+
+    def __init__(self, archive, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.archive = archive
+
+    def send(self, request, *args, **kwargs):
+        response = super().send(request, *args, **kwargs)
+        raw_headers = response.raw.headers if response.raw is not None else response.headers
+        # Header by header, so several Set-Cookie headers stay separate
+        pairs = raw_headers.iteritems() if hasattr(raw_headers, 'iteritems') else raw_headers.items()
+        headers = [[name, value] for name, value in pairs if name.lower() not in SKIPPED_HEADERS]
+        try:
+            self.archive.put(request_key(request.method, request.url, request.headers.get('Referer')),
+                             request.url, response.status_code, headers, response.content)
+        except Exception as e:
+            print(f"Error recording {request.url}: {e}", file=sys.stderr)
+        return response
+
+class ReplayAdapter(SharedHTTPAdapter):
+    """
+    Adapter that sends every request to the stand-in server instead.
+
+    The original URL goes along in a header; the session still sees the
+    original URL, so cookies, rate limits and metrics stay per county.
+    """
+
+    def __init__(self, target, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.target = target.rstrip('/')
+
+    def request_host(self, request):
+        # Throttles and retries count against the recorded host, not the stand-in server
+        return host_key(request.headers.get(REPLAY_URL_HEADER) or request.url)
+
+    def send(self, request, *args, **kwargs):
+        original = request.url
+        parts = urlsplit(original)
+        request.headers[REPLAY_URL_HEADER] = original
+        request.url = f"{self.target}{parts.path or '/'}" + (f"?{parts.query}" if parts.query else "")
+        try:
+            response = super().send(request, *args, **kwargs)
+        finally:
+            request.url = original
+        response.url = original
+        return response
+
+class ReplayServer(ThreadingHTTPServer):
+    """
+    Local stand-in for the recorded sites.
+
+    Answers every request from the archive after `latency` (+/- `jitter`)
+    seconds. A share of `error_rate` requests gets `error_status` instead
+    (with Retry-After for 429/503), to see how the crawler copes.
+    """
+    daemon_threads = True
+
+    def __init__(self, address, archive, latency=0.0, jitter=0.0, error_rate=0.0, error_status=503,
+                 retry_after=1, seed=None):
+        super().__init__(address, ReplayHandler)
+        self.archive = archive
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.counts = {"requests": 0, "hits": 0, "misses": 0, "errors": 0}
+        self._lock = threading.Lock()
+
+    def count(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def delay(self):
+        with self._lock:
+            delay = self.latency + self.random.uniform(-self.jitter, self.jitter)
+            fail = self.random.random() < self.error_rate
+        return max(delay, 0.0), fail
+
+    def summary(self):
+        counts = self.counts
+        return (f"Replay: {counts['requests']} requests, {counts['hits']} replayed, "
+                f"{counts['misses']} not recorded, {counts['errors']} injected errors")
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.replay()
+
+    def do_HEAD(self):
+        self.replay(send_body=False)
+
+    def replay(self, send_body=True):
+        server = self.server
+        server.count("requests")
+        delay, fail = server.delay()
+        if delay:
+            time.sleep(delay)
+        if fail:
+            server.count("errors")
+            headers = [["Retry-After", str(server.retry_after)]] if server.error_status in (429, 503) else []
+            self.respond(server.error_status, headers, b"injected error", send_body)
+            return
+
+        url = self.headers.get(REPLAY_URL_HEADER) or self.path
+        recorded = server.archive.get(request_key(self.command if self.command != "HEAD" else "GET", url,
+                                                  self.headers.get('Referer')))
+        if recorded is None:
+            server.count("misses")
+            self.respond(404, [["Content-Type", "text/plain"]], f"not recorded: {url}".encode(), send_body)
+            return
+        server.count("hits")
+        status, headers, body = recorded
+        self.respond(status, headers, body, send_body)
+
+    def respond(self, status, headers, body, send_body=True):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
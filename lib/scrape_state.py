@@ -0,0 +1,177 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from lib.auction_record import AuctionRecord
+
+DEFAULT_PATH = "data/scrape_state.sqlite"
+
+STATE = None
+_STATE_LOCK = threading.Lock()
+
+def item_hash(item_html):
+    """Content hash of an item's HTML; any change on the page (status included) changes it"""
+    return hashlib.blake2b(item_html.encode('utf-8'), digest_size=16).hexdigest()
+
+class ScrapeState:
+    """
+    What the last scrape of each (county, auction date) saw.
+
+    Keeps the scrape time, the rlist auction IDs and the content hash of
+    every item so a re-run only has to parse the items that changed.
+    Calendars get the same treatment: their validators (ETag,
+    Last-Modified), content hash and active days, so an unchanged month
+    costs one conditional request. A changed calendar is only staged when
+    it is read and saved by commit_calendar once its dates are handled,
+    so a run that stops half way reads it as changed again.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # (county, url) -> put_calendar arguments of calendars read but not yet committed
+        self._staged_calendars = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS scrape_state ("
+            "county TEXT NOT NULL, auction_date TEXT NOT NULL, scraped_at TEXT NOT NULL, "
+            "auction_ids TEXT NOT NULL, item_hashes TEXT NOT NULL, "
+            "PRIMARY KEY (county, auction_date))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS calendar_state ("
+            "county TEXT NOT NULL, url TEXT NOT NULL, checked_at TEXT NOT NULL, etag TEXT, last_modified TEXT, "
+            "content_hash TEXT NOT NULL, active_days TEXT NOT NULL, "
+            "PRIMARY KEY (county, url))"
+        )
+        self._conn.commit()
+
+    def get(self, county, date):
+        """Return {"scraped_at", "auction_ids", "item_hashes"} or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT scraped_at, auction_ids, item_hashes FROM scrape_state WHERE county = ? AND auction_date = ?",
+                (county, date),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "scraped_at": row[0],
+            "auction_ids": json.loads(row[1]),
+            "item_hashes": json.loads(row[2]),
+        }
+
+    def put(self, county, date, auction_ids, item_hashes):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO scrape_state (county, auction_date, scraped_at, auction_ids, item_hashes) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (county, date, datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                 json.dumps(auction_ids), json.dumps(item_hashes)),
+            )
+            self._conn.commit()
+
+    def get_calendar(self, county, url):
+        """Return {"checked_at", "etag", "last_modified", "content_hash", "active_days"} or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT checked_at, etag, last_modified, content_hash, active_days FROM calendar_state "
+                "WHERE county = ? AND url = ?",
+                (county, url),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "checked_at": row[0],
+            "etag": row[1],
+            "last_modified": row[2],
+            "content_hash": row[3],
+            "active_days": json.loads(row[4]),
+        }
+
+    def put_calendar(self, county, url, etag, last_modified, content_hash, active_days):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO calendar_state "
+                "(county, url, checked_at, etag, last_modified, content_hash, active_days) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (county, url, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), etag, last_modified,
+                 content_hash, json.dumps(active_days)),
+            )
+            self._conn.commit()
+
+    def stage_calendar(self, county, url, etag, last_modified, content_hash, active_days):
+        """Hold a changed calendar until commit_calendar"""
+        with self._lock:
+            self._staged_calendars[(county, url)] = (etag, last_modified, content_hash, active_days)
+
+    def commit_calendar(self, county, url):
+        """Save the staged calendar of (county, url), if there is one"""
+        with self._lock:
+            staged = self._staged_calendars.pop((county, url), None)
+        if staged is not None:
+            self.put_calendar(county, url, *staged)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def get_state():
+    global STATE
+    with _STATE_LOCK:
+        if STATE is None:
+            STATE = ScrapeState()
+        return STATE
+
+def keep_realtor_link(record, stored):
+    """Carry the realtor.com link of the saved item over to a re-parsed record of the same property"""
+    if stored and 'realtor_link' in stored and stored.get('property_address') == record.property_address:
+        record.realtor_link = stored['realtor_link']
+        record.enriched = True
+
+def merge_items(parse_data, item_index, auction_ids, county, previous_hashes, stored_items, auction_date=None):
+    """
+    Build the records of a re-scraped date, parsing only what changed
+
+    Args:
+        parse_data: ParseData used for the added and changed items
+        item_index: Auction ID -> item HTML of the new payload
+        auction_ids: rlist of the new payload
+        county: County whose layout the items use
+        previous_hashes: Auction ID -> content hash from the last scrape
+        stored_items: Auction ID -> item saved by the last scrape
+        auction_date: Auction date (MM/DD/YYYY) set on the records
+
+    Returns:
+        (AuctionRecords in rlist order, item hashes, {"added", "changed", "removed", "unchanged"} counts)
+    """
+    hashes = {auction_id: item_hash(item_index[auction_id])
+              for auction_id in auction_ids if auction_id in item_index}
+    # Items saved before the auction status was parsed are parsed again once
+    to_parse = [auction_id for auction_id, digest in hashes.items()
+                if previous_hashes.get(auction_id) != digest or auction_id not in stored_items
+                or 'auction_status' not in stored_items[auction_id]]
+    parsed = {record.auction_id: record
+              for record in parse_data.parse_records(item_index, to_parse, county, auction_date)}
+
+    records = []
+    for auction_id in hashes:
+        record = parsed.get(auction_id)
+        if record is None:
+            record = AuctionRecord.from_item(stored_items[auction_id], auction_date)
+        else:
+            keep_realtor_link(record, stored_items.get(auction_id))
+        records.append(record)
+
+    changes = {
+        "added": sum(1 for auction_id in to_parse if auction_id not in previous_hashes),
+        "changed": sum(1 for auction_id in to_parse if auction_id in previous_hashes),
+        "removed": sum(1 for auction_id in previous_hashes if auction_id not in hashes),
+        "unchanged": len(hashes) - len(to_parse),
+    }
+    return records, hashes, changes
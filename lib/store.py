@@ -0,0 +1,284 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+
+from lib.auction_record import AuctionRecord, legacy_item, normalize_item
+
+DEFAULT_PATH = "data/auctions.sqlite"
+
+STORE = None
+_STORE_LOCK = threading.Lock()
+
+# Item fields that get their own column; the whole item is kept as JSON too
+ITEM_COLUMNS = ("auction_type", "case_number", "parcel_id", "property_address", "realtor_link")
+# Money fields, stored as integer cents in <field>_cents
+MONEY_COLUMNS = ("final_judgment_amount", "assessed_value", "plaintiff_max_bid")
+
+# PRAGMA user_version of the current schema: 0 kept money as text, 1 added the cents
+# columns next to the text ones, 2 has the cents columns only
+SCHEMA_VERSION = 2
+
+ITEMS_TABLE = """
+CREATE TABLE IF NOT EXISTS {table} (
+    county TEXT NOT NULL,
+    auction_date TEXT NOT NULL,
+    auction_day TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    auction_id TEXT NOT NULL,
+    auction_type TEXT,
+    case_number TEXT,
+    parcel_id TEXT,
+    property_address TEXT,
+    realtor_link TEXT,
+    final_judgment_amount_cents INTEGER,
+    assessed_value_cents INTEGER,
+    plaintiff_max_bid_cents INTEGER,
+    item TEXT NOT NULL,
+    PRIMARY KEY (county, auction_date, position)
+);
+"""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS auction_dates (
+    county TEXT NOT NULL,
+    auction_date TEXT NOT NULL,
+    auction_day TEXT NOT NULL,
+    url TEXT,
+    scrape_date TEXT,
+    PRIMARY KEY (county, auction_date)
+);
+CREATE INDEX IF NOT EXISTS auction_dates_day ON auction_dates (auction_day);
+""" + ITEMS_TABLE.format(table="auction_items") + """
+CREATE INDEX IF NOT EXISTS auction_items_day ON auction_items (auction_day, county);
+CREATE INDEX IF NOT EXISTS auction_items_parcel ON auction_items (parcel_id);
+"""
+
+INSERT_ITEM = (
+    f"INSERT INTO {{table}} (county, auction_date, auction_day, position, auction_id, "
+    f"{', '.join(ITEM_COLUMNS)}, {', '.join(f'{column}_cents' for column in MONEY_COLUMNS)}, item) "
+    f"VALUES ({', '.join('?' * (len(ITEM_COLUMNS) + len(MONEY_COLUMNS) + 6))})"
+)
+
+def item_row(county, date, day, position, item):
+    """Values of an auction_items row (INSERT_ITEM order); money in the item may be strings or numbers"""
+    record = AuctionRecord.from_item(item)
+    return (
+        (county, date, day, position, record.auction_id)
+        + tuple(None if item.get(column) is None else str(item.get(column)) for column in ITEM_COLUMNS)
+        + (record.final_judgment_cents, record.assessed_value_cents, record.plaintiff_max_bid_cents)
+        + (json.dumps(normalize_item(item, record), default=str),)
+    )
+
+def auction_day(date):
+    """MM/DD/YYYY (as used by the auction sites) -> YYYY-MM-DD, which sorts and compares as text"""
+    try:
+        return datetime.strptime(date, "%m/%d/%Y").strftime("%Y-%m-%d")
+    except ValueError:
+        return date
+
+class AuctionStore:
+    """
+    All scraped auction dates in one SQLite database.
+
+    A date is stored as a whole, in the same shape as the JSON files fc.py
+    used to write ({"url", "auction_date", "scrape_date", "auction_items"}),
+    and indexed by county and day so queries don't have to read everything.
+    Money is normalized to numbers on the way in (cents in the columns,
+    dollars in the item JSON).
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        existing = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'auction_items'"
+        ).fetchone()
+        if existing and version < 2:
+            self._rebuild_items()
+        self._conn.executescript(SCHEMA)
+        self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._conn.commit()
+
+    def _rebuild_items(self):
+        """
+        Move auction_items of an older schema to the current one
+
+        Version 0 kept money as "$1,234.56" text and version 1 left those text
+        columns behind next to the cents ones. The table is copied into a new
+        one without them, with the cents and item JSON computed from the item
+        JSON of every row.
+        """
+        with self._conn:
+            self._conn.execute("DROP TABLE IF EXISTS auction_items_upgrade")
+            self._conn.execute(ITEMS_TABLE.format(table="auction_items_upgrade"))
+            rows = self._conn.execute(
+                "SELECT county, auction_date, auction_day, position, item FROM auction_items"
+            ).fetchall()
+            self._conn.executemany(
+                INSERT_ITEM.format(table="auction_items_upgrade"),
+                (item_row(county, date, day, position, json.loads(item_json))
+                 for county, date, day, position, item_json in rows),
+            )
+            # Its indexes go with it and are created again on the new table
+            self._conn.execute("DROP TABLE auction_items")
+            self._conn.execute("ALTER TABLE auction_items_upgrade RENAME TO auction_items")
+
+    def save(self, county, data):
+        """Insert or replace one auction date; money in the items may be strings or numbers"""
+        date = data["auction_date"]
+        day = auction_day(date)
+        rows = [item_row(county, date, day, position, item)
+                for position, item in enumerate(data.get("auction_items", []))]
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM auction_items WHERE county = ? AND auction_date = ?", (county, date))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO auction_dates (county, auction_date, auction_day, url, scrape_date) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (county, date, day, data.get("url"), data.get("scrape_date")),
+            )
+            self._conn.executemany(INSERT_ITEM.format(table="auction_items"), rows)
+
+    def has_date(self, county, date):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM auction_dates WHERE county = ? AND auction_date = ?", (county, date)
+            ).fetchone()
+        return row is not None
+
+    def dates(self, county=None):
+        """(county, auction date) of every stored date"""
+        with self._lock:
+            if county:
+                rows = self._conn.execute(
+                    "SELECT county, auction_date FROM auction_dates WHERE county = ? ORDER BY auction_day", (county,)
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT county, auction_date FROM auction_dates ORDER BY county, auction_day"
+                ).fetchall()
+        return [tuple(row) for row in rows]
+
+    def load(self, county, date):
+        """One auction date in the JSON file shape, or None"""
+        for _, data in self.iter_data(county=county, date=date):
+            return data
+        return None
+
+    def iter_data(self, county=None, date=None, date_from=None, date_to=None):
+        """
+        Yield (county, data) for every stored auction date matching the filters
+
+        Args:
+            county: Only this county
+            date: Only this auction date (MM/DD/YYYY)
+            date_from: First day to include (YYYY-MM-DD)
+            date_to: Last day to include (YYYY-MM-DD)
+        """
+        conditions, params = [], []
+        if county:
+            conditions.append("county = ?")
+            params.append(county)
+        if date:
+            conditions.append("auction_date = ?")
+            params.append(date)
+        if date_from:
+            conditions.append("auction_day >= ?")
+            params.append(date_from)
+        if date_to:
+            conditions.append("auction_day <= ?")
+            params.append(date_to)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._lock:
+            dates = self._conn.execute(
+                f"SELECT county, auction_date, url, scrape_date FROM auction_dates {where} "
+                "ORDER BY county, auction_day", params
+            ).fetchall()
+        for county_name, auction_date, url, scrape_date in dates:
+            with self._lock:
+                items = self._conn.execute(
+                    "SELECT item FROM auction_items WHERE county = ? AND auction_date = ? ORDER BY position",
+                    (county_name, auction_date),
+                ).fetchall()
+            yield county_name, {
+                "url": url,
+                "auction_date": auction_date,
+                "scrape_date": scrape_date,
+                "auction_items": [json.loads(item) for item, in items],
+            }
+
+    def links(self):
+        """(county, parcel ID, property address, realtor.com link) of every item that has a link"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT county, parcel_id, property_address, realtor_link FROM auction_items WHERE realtor_link IS NOT NULL"
+            ).fetchall()
+
+    def count(self):
+        with self._lock:
+            dates = self._conn.execute("SELECT COUNT(*) FROM auction_dates").fetchone()[0]
+            items = self._conn.execute("SELECT COUNT(*) FROM auction_items").fetchone()[0]
+        return dates, items
+
+    def import_json_tree(self, path="./data"):
+        """
+        Import data/<COUNTY>/<date>.json files written by earlier versions
+
+        Returns:
+            Number of files imported
+        """
+        imported = 0
+        for root, dirs, files in os.walk(path):
+            county = os.path.basename(os.path.normpath(root))
+            for file in sorted(files):
+                if not file.endswith('.json'):
+                    continue
+                file_path = os.path.join(root, file)
+                try:
+                    with open(file_path) as f:
+                        data = json.load(f)
+                except (OSError, json.JSONDecodeError) as e:
+                    print(f"Error reading {file_path}: {e}", file=sys.stderr)
+                    continue
+                if isinstance(data, dict) and 'auction_items' in data and 'auction_date' in data:
+                    self.save(county, data)
+                    imported += 1
+        return imported
+
+    def export_json_tree(self, path="./data", county=None, date=None):
+        """
+        Write stored dates back out as <path>/<COUNTY>/<date>.json
+
+        The files have the layout fc.py used to write, money included
+        ("$1,234.56" and "Hidden" strings), so older tools can read them.
+
+        Returns:
+            Number of files written
+        """
+        exported = 0
+        for county_name, data in self.iter_data(county=county, date=date):
+            os.makedirs(os.path.join(path, county_name), exist_ok=True)
+            filename = os.path.join(path, county_name, f"{data['auction_date'].replace('/', '_')}.json")
+            data["auction_items"] = [legacy_item(item) for item in data["auction_items"]]
+            with open(filename, 'w') as f:
+                json.dump(data, f, indent=4, default=str)
+            exported += 1
+        return exported
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def get_store(path=DEFAULT_PATH):
+    global STORE
+    with _STORE_LOCK:
+        if STORE is None:
+            STORE = AuctionStore(path)
+        return STORE
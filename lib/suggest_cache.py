@@ -0,0 +1,142 @@
+import os
+import sqlite3
+import threading
+import time
+
+from lib import metrics
+from lib.address import canonical_address
+
+DEFAULT_PATH = "data/realtor_cache.sqlite"
+DAY = 24 * 60 * 60
+
+# Returned by SuggestCache.get when nothing usable is cached
+MISS = object()
+
+# PRAGMA user_version of the cache: 0 keyed rows by normalized address, 1 by canonical address
+KEY_VERSION = 1
+
+CACHE = None
+_CACHE_LOCK = threading.Lock()
+
+class SuggestCache:
+    """
+    Persistent cache of realtor.com links keyed by canonical address.
+
+    A lookup that found no property is cached as None (negative entry) with
+    its own, shorter TTL. The cache keeps at most max_entries rows and drops
+    the least recently used ones beyond that.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, ttl=30 * DAY, negative_ttl=7 * DAY, max_entries=100000):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS suggest ("
+            "address TEXT PRIMARY KEY, link TEXT, created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS suggest_accessed ON suggest (accessed)")
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] < KEY_VERSION:
+            self._rekey()
+        self._conn.execute(f"PRAGMA user_version = {KEY_VERSION}")
+        self._conn.commit()
+        self._size = self._conn.execute("SELECT COUNT(*) FROM suggest").fetchone()[0]
+
+    def _rekey(self):
+        """Key the rows of an older cache by canonical address; of the rows that end up on one key the newest stays"""
+        with self._conn:
+            rows = self._conn.execute("SELECT address, link, created, accessed FROM suggest ORDER BY created").fetchall()
+            rekeyed = {}
+            for address, link, created, accessed in rows:
+                key = canonical_address(address)
+                previous = rekeyed.get(key)
+                # Later rows are newer; the entry stays as recently used as its most recent spelling
+                rekeyed[key] = (link, created, max(accessed, previous[2]) if previous else accessed)
+            self._conn.execute("DELETE FROM suggest")
+            self._conn.executemany(
+                "INSERT INTO suggest (address, link, created, accessed) VALUES (?, ?, ?, ?)",
+                ((key,) + values for key, values in rekeyed.items()),
+            )
+
+    def get(self, address):
+        """Return the cached link, None for a cached "no match", or MISS."""
+        key = canonical_address(address)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT link, created FROM suggest WHERE address = ?", (key,)).fetchone()
+            if row is not None:
+                link, created = row
+                ttl = self.ttl if link is not None else self.negative_ttl
+                if now - created <= ttl:
+                    self._conn.execute("UPDATE suggest SET accessed = ? WHERE address = ?", (now, key))
+                    self._conn.commit()
+                    if link is None:
+                        self.negative_hits += 1
+                        metrics.incr("cache_negative_hits")
+                    else:
+                        self.hits += 1
+                        metrics.incr("cache_hits")
+                    return link
+            self.misses += 1
+            metrics.incr("cache_misses")
+            return MISS
+
+    def put(self, address, link):
+        """Cache a lookup result; link None records that nothing matched."""
+        key = canonical_address(address)
+        now = time.time()
+        with self._lock:
+            inserted = self._conn.execute("SELECT 1 FROM suggest WHERE address = ?", (key,)).fetchone() is None
+            self._conn.execute(
+                "INSERT OR REPLACE INTO suggest (address, link, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, link, now, now),
+            )
+            if inserted:
+                self._size += 1
+            if self._size > self.max_entries:
+                self._evict(self._size - self.max_entries)
+            self._conn.commit()
+
+    def _evict(self, count):
+        self._conn.execute(
+            "DELETE FROM suggest WHERE address IN (SELECT address FROM suggest ORDER BY accessed LIMIT ?)",
+            (count,),
+        )
+        self._size -= count
+        self.evictions += count
+
+    def links(self):
+        """(address, link) of every cached match, whatever its age"""
+        with self._lock:
+            return self._conn.execute("SELECT address, link FROM suggest WHERE link IS NOT NULL").fetchall()
+
+    def summary(self):
+        return (f"Realtor cache: {self.hits} hits, {self.negative_hits} negative hits, "
+                f"{self.misses} misses, {self.evictions} evictions, {self._size} entries")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def configure(**kwargs):
+    """Replace the run's cache, e.g. with CLI TTLs."""
+    global CACHE
+    with _CACHE_LOCK:
+        CACHE = SuggestCache(**kwargs)
+    return CACHE
+
+def get_cache():
+    global CACHE
+    with _CACHE_LOCK:
+        if CACHE is None:
+            CACHE = SuggestCache()
+        return CACHE
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+# move auction data between the data/<COUNTY>/<date>.json tree and the SQLite store
+#   python migrate.py import            load every JSON file under ./data into the store
+#   python migrate.py export --path out write the store back out as JSON files
+# the store keeps money as numbers; export writes it back as "$1,234.56"/"Hidden" strings
+import argparse
+from lib.store import AuctionStore, DEFAULT_PATH
+
+def main():
+    parser = argparse.ArgumentParser(description='Import or export the auction store')
+    parser.add_argument('action', choices=['import', 'export'], help='import JSON files into the store, or export the store to JSON files')
+    parser.add_argument('--path', default='./data', help='Root of the JSON tree (data/<COUNTY>/<date>.json)')
+    parser.add_argument('--store', default=DEFAULT_PATH, help='SQLite store')
+    parser.add_argument('--county', help='Only export this county')
+    args = parser.parse_args()
+
+    store = AuctionStore(args.store)
+    if args.action == 'import':
+        imported = store.import_json_tree(args.path)
+        print(f"Imported {imported} files into {args.store}")
+    else:
+        exported = store.export_json_tree(args.path, county=args.county)
+        print(f"Exported {exported} files to {args.path}")
+    dates, items = store.count()
+    print(f"Store holds {dates} auction dates with {items} items")
+
+if __name__ == "__main__":
+    main()
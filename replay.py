@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# offline stand-in for the auction sites and realtor.com
+#   python fc.py --batch --record data/replay.sqlite     record a run's responses
+#   python replay.py serve --latency 0.2 --error-rate 0.05   answer from the archive
+#   python fc.py --batch --force --replay http://127.0.0.1:8900   crawl against it
+#   python replay.py info                                  what the archive holds
+import argparse
+from lib.replay import DEFAULT_PATH, ReplayArchive, ReplayServer
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve recorded responses, or show what an archive holds')
+    parser.add_argument('action', choices=['serve', 'info'], help='serve the archive, or print its contents per host')
+    parser.add_argument('--archive', default=DEFAULT_PATH, help='Replay archive (fc.py --record)')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on')
+    parser.add_argument('--port', type=int, default=8900, help='Port to listen on')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds before every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Random +/- seconds added to the latency')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests answered with --error-status, e.g. 0.05')
+    parser.add_argument('--error-status', type=int, default=503, help='Status of the injected errors')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds sent with injected 429/503')
+    parser.add_argument('--seed', type=int, help='Random seed, for repeatable latency and errors')
+    args = parser.parse_args()
+
+    archive = ReplayArchive(args.archive)
+    if args.action == 'info':
+        hosts = archive.stats()
+        if not hosts:
+            print(f"{args.archive} holds no responses")
+        for host, stats in sorted(hosts.items()):
+            print(f"{host}: {stats['responses']} responses, {stats['bytes']} bytes "
+                  f"({stats['stored_bytes']} stored)")
+        archive.close()
+        return
+
+    server = ReplayServer((args.host, args.port), archive, latency=args.latency, jitter=args.jitter,
+                          error_rate=args.error_rate, error_status=args.error_status,
+                          retry_after=args.retry_after, seed=args.seed)
+    print(f"Replaying {args.archive} on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(server.summary())
+        archive.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from lib.auction_record import AuctionRecord, legacy_item, parse_cents
+
+LEGACY_ITEM = {
+    "auction_id": "101", "auction_type": "FORECLOSURE", "case_number": "2024-CA-000101",
+    "final_judgment_amount": "$123,456.78", "parcel_id": "01-21-30-500-0000-0010",
+    "property_address": "123 MAIN ST, ORLANDO, FL-32801", "assessed_value": "$0.10",
+    "plaintiff_max_bid": "Hidden", "auction_status": "Sold", "sold_amount": "$1,000,000.01",
+    "realtor_link": "https://www.realtor.com/realestateandhomes-detail/M1",
+}
+
+
+@pytest.mark.parametrize("text, cents", [
+    ("$123,456.78", 12345678), ("$0.10", 10), ("$1,000,000.01", 100000001), ("$5.00", 500),
+    ("Hidden", None), ("", None),
+])
+def test_parse_cents(text, cents):
+    assert parse_cents(text) == cents
+
+
+def test_legacy_dict_round_trips_the_cents():
+    record = AuctionRecord.from_item(LEGACY_ITEM, "10/01/2026")
+    assert (record.final_judgment_cents, record.assessed_value_cents, record.sold_amount_cents) == (12345678, 10, 100000001)
+    assert record.plaintiff_max_bid_cents is None
+    assert record.hidden == ("plaintiff_max_bid",)
+
+    assert record.to_legacy_dict() == LEGACY_ITEM
+    assert AuctionRecord.from_item(record.to_legacy_dict(), "10/01/2026") == record
+
+
+def test_saved_item_converts_back_to_legacy():
+    saved = AuctionRecord.from_item(LEGACY_ITEM).to_dict()
+    assert saved["final_judgment_amount"] == 123456.78
+    assert saved["plaintiff_max_bid"] is None
+    assert saved["hidden"] == ["plaintiff_max_bid"]
+    # From dollars as floats back to the same cents
+    assert AuctionRecord.from_item(saved).final_judgment_cents == 12345678
+    assert legacy_item(saved) == LEGACY_ITEM
+
+
+def test_empty_amounts_stay_empty():
+    item = dict(LEGACY_ITEM, assessed_value="", plaintiff_max_bid="", auction_status="Scheduled", sold_amount="")
+    del item["realtor_link"]
+    record = AuctionRecord.from_item(item)
+    assert record.assessed_value_cents is None
+    assert record.hidden == ()
+    assert record.to_legacy_dict() == item
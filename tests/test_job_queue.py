@@ -0,0 +1,56 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib.job_queue import DONE, FAILED, PENDING, RUNNING, JobQueue
+
+
+def test_failed_jobs_keep_their_attempts_across_runs(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite"))
+    queue.add("ORANGE", "10/01/2026")
+    queue.start("ORANGE", "10/01/2026")
+    queue.fail("ORANGE", "10/01/2026", "timeout")
+    assert queue.claimable(max_attempts=2) == [("ORANGE", "10/01/2026")]
+
+    # The next run queues the date again: the failure still counts
+    queue.add_many([("ORANGE", "10/01/2026")])
+    assert queue.failures() == [("ORANGE", "10/01/2026", 1, "timeout")]
+    queue.start("ORANGE", "10/01/2026")
+    queue.fail("ORANGE", "10/01/2026", "timeout")
+    queue.add("ORANGE", "10/01/2026")
+    assert queue.claimable(max_attempts=2) == []
+    assert queue.claimable(max_attempts=3) == [("ORANGE", "10/01/2026")]
+    assert queue.failures() == [("ORANGE", "10/01/2026", 2, "timeout")]
+    queue.close()
+
+
+def test_done_jobs_are_queued_afresh(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite"))
+    queue.add("ORANGE", "10/01/2026")
+    queue.start("ORANGE", "10/01/2026")
+    queue.fail("ORANGE", "10/01/2026", "timeout")
+    queue.start("ORANGE", "10/01/2026")
+    queue.done("ORANGE", "10/01/2026")
+    assert queue.counts()[DONE] == 1
+    assert queue.claimable() == []
+
+    queue.add("ORANGE", "10/01/2026")
+    assert queue.counts()[PENDING] == 1
+    queue.start("ORANGE", "10/01/2026")
+    queue.fail("ORANGE", "10/01/2026", "timeout")
+    # The attempt of the earlier scrape doesn't count
+    assert queue.failures() == [("ORANGE", "10/01/2026", 1, "timeout")]
+    queue.close()
+
+
+def test_running_jobs_are_recovered_not_requeued(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite"))
+    queue.add_many([("ORANGE", "10/01/2026"), ("SEMINOLE", "10/02/2026")])
+    queue.start("ORANGE", "10/01/2026")
+    queue.add("ORANGE", "10/01/2026")
+    assert queue.counts() == {PENDING: 1, RUNNING: 1, DONE: 0, FAILED: 0}
+
+    assert queue.recover() == 1
+    assert queue.claimable(counties={"ORANGE"}) == [("ORANGE", "10/01/2026")]
+    queue.close()
@@ -0,0 +1,51 @@
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib import match_index
+from lib.match_index import KEY_VERSION, MatchIndex
+from lib.store import AuctionStore
+
+PARCEL = "01-21-30-500-0000-0010"
+
+
+def test_same_parcel_id_in_two_counties(tmp_path):
+    index = MatchIndex(str(tmp_path / "index.sqlite"))
+    index.put("https://www.realtor.com/realestateandhomes-detail/M1", PARCEL, county="ORANGE")
+    index.add_many([("SEMINOLE", PARCEL, None, "https://www.realtor.com/realestateandhomes-detail/M2")])
+
+    assert index.get(PARCEL, county="orange") == "https://www.realtor.com/realestateandhomes-detail/M1"
+    assert index.get(PARCEL, county="SEMINOLE") == "https://www.realtor.com/realestateandhomes-detail/M2"
+    assert index.get(PARCEL, county="VOLUSIA") is None
+    # Without a county the parcel ID can't be told apart
+    assert index.get(PARCEL) is None
+    index.close()
+
+
+def test_old_index_is_rebuilt_from_the_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(match_index, "INDEX", None)
+    path = str(tmp_path / "index.sqlite")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE parcels (parcel_id TEXT PRIMARY KEY, link TEXT NOT NULL, updated REAL NOT NULL)")
+    conn.execute("CREATE TABLE addresses (address TEXT PRIMARY KEY, link TEXT NOT NULL, updated REAL NOT NULL)")
+    conn.execute("INSERT INTO parcels VALUES (?, 'https://www.realtor.com/realestateandhomes-detail/M9', 0)", (PARCEL,))
+    conn.commit()
+    conn.close()
+
+    store = AuctionStore(str(tmp_path / "auctions.sqlite"))
+    store.save("ORANGE", {"auction_date": "10/01/2026", "url": "u", "auction_items": [{
+        "auction_id": "101", "parcel_id": PARCEL, "property_address": "123 MAIN ST, ORLANDO, FL-32801",
+        "realtor_link": "https://www.realtor.com/realestateandhomes-detail/M1",
+    }]})
+    index = match_index.configure(path, store=store)
+    store.close()
+
+    assert index.get(PARCEL, county="ORANGE") == "https://www.realtor.com/realestateandhomes-detail/M1"
+    assert index.get(PARCEL, county="SEMINOLE") is None
+    assert index.get(address="123 Main Street, Orlando, FL 32801") == "https://www.realtor.com/realestateandhomes-detail/M1"
+    index.close()
+    conn = sqlite3.connect(path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == KEY_VERSION
+    conn.close()
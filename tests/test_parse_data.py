@@ -0,0 +1,71 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from bench.bench_parse import RescanParseData
+from bench.fixtures import ORANGE_ROW, auction_payload
+from lib.parse_data import ParseData
+
+
+def payload(item_id, rows):
+    html = (f'<div id="AITEM_{item_id}" class="AUCTION_ITEM PREVIEW" aid="{item_id}">@AAUCTION_DETAILS">'
+            + "".join(rows) + '@B@B<div class="@E_ITEM_SPACER">&nbsp;</div>')
+    return json.dumps({"retHTML": html, "rlist": str(item_id)})
+
+
+def test_row_without_start_marker_leaves_later_rows_alone():
+    # The Case # cell lacks its @AAD_DTA marker
+    raw = payload(7, [
+        ORANGE_ROW.format(label="Case #:", cls="XXX", value="<a>2024-CA-1</a>"),
+        ORANGE_ROW.format(label="Final Judgment Amount:", cls="CAD_DTA", value="$100,000.00"),
+        ORANGE_ROW.format(label="Parcel ID:", cls="AAD_DTA", value="<a>12-34</a>"),
+        ORANGE_ROW.format(label="Property Address:", cls="CAD_DTA", value="1 MAIN ST"),
+        ORANGE_ROW.format(label="", cls="CAD_DTA", value="ORLANDO, 32801"),
+        ORANGE_ROW.format(label="Assessed Value:", cls="CAD_DTA", value="$200,000.00"),
+    ])
+    item, = ParseData().parse_auction_data(raw, "ORANGE")
+    # Same as the original parser: the label search runs on to the next marker
+    assert item["case_number"] == "12-34"
+    assert item["final_judgment_amount"] == "$100,000.00"
+    assert item["parcel_id"] == "12-34"
+    assert item["property_address"] == "1 MAIN ST, ORLANDO, FL 32801"
+    assert item["assessed_value"] == "$200,000.00"
+    assert item["plaintiff_max_bid"] == ""
+
+
+@pytest.mark.parametrize("county", ["SEMINOLE", "ORANGE"])
+@pytest.mark.parametrize("seed", range(6))
+def test_same_items_as_the_rescan_parser_on_malformed_payloads(county, seed):
+    raw = auction_payload(30, "orange" if county == "ORANGE" else "default", seed=seed)
+    # Drop some end and start markers and pad the zip codes
+    raw = raw.replace("@G", "@X", 3).replace("@B", "@Y", 2).replace('AAD_DTA"', 'XXX"', 2).replace("FL-", "FL-  ", 5)
+    assert ParseData().parse_auction_data(raw, county) == RescanParseData().parse_auction_data(raw, county)
+
+
+SCHEDULED = '@AAUCTION_STATS">@AASTAT_MSGA ASTAT_LBL">Auction Starts@BASTAT_MSGB Astat_DATA">10:00 AM ET@B@B'
+SOLD = ('@AAUCTION_STATS">@AASTAT_MSGA ASTAT_LBL">Auction Sold@BASTAT_MSGB Astat_DATA">10/01/2026 10:05 AM ET@B'
+        '@AASTAT_MSGC ASTAT_LBL">Amount@BASTAT_MSGD Astat_DATA">$150,100.00@B@B')
+CANCELED = ('@AAUCTION_STATS">@AASTAT_MSGA ASTAT_LBL">Auction Status@BASTAT_MSGB Astat_DATA">Canceled per County@B'
+            '@AASTAT_MSGC ASTAT_LBL">@BASTAT_MSGD Astat_DATA">@B@B')
+
+
+@pytest.mark.parametrize("stats, expected", [
+    (SCHEDULED, ("Scheduled", "")),
+    (SOLD, ("Sold", "$150,100.00")),
+    (CANCELED, ("Canceled per County", "")),
+    ("", ("", "")),
+])
+def test_parse_status(stats, expected):
+    assert ParseData().parse_status(f'<div id="AITEM_7" class="AUCTION_ITEM PREVIEW" aid="7">{stats}') == expected
+
+
+def test_items_carry_their_status():
+    data = json.loads(auction_payload(2, "orange"))
+    data["retHTML"] = data["retHTML"].replace(SCHEDULED.replace("10:00", "11:00"), SOLD, 1)
+    sold, scheduled = ParseData().parse_auction_data(json.dumps(data), "ORANGE")
+    assert (sold["auction_status"], sold["sold_amount"]) == ("Sold", "$150,100.00")
+    assert (scheduled["auction_status"], scheduled["sold_amount"]) == ("Scheduled", "")
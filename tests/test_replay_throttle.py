@@ -0,0 +1,36 @@
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib.http_session import SessionFactory
+from lib.rate_limit import RateLimiter
+from lib.replay import ReplayArchive, ReplayServer
+
+
+def test_replayed_throttles_count_against_the_county(tmp_path):
+    archive = ReplayArchive(str(tmp_path / "replay.sqlite"))
+    # Every request gets a 503
+    server = ReplayServer(("127.0.0.1", 0), archive, error_rate=1.0, error_status=503, retry_after=0, seed=1)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    limiter = RateLimiter(rate=4.0, log_interval=None)
+    factory = SessionFactory(retries=2, backoff_factor=0, rate_limiter=limiter,
+                             replay=f"http://127.0.0.1:{server.server_address[1]}")
+    try:
+        response = factory.new_session().get("https://county.example.com/index.cfm?zaction=USER&zmethod=CALENDAR")
+    finally:
+        factory.close()
+        server.shutdown()
+        server.server_close()
+        archive.close()
+
+    assert response.status_code == 503
+    assert server.counts["errors"] == 3
+    assert set(limiter.buckets) == {"county.example.com"}
+    bucket = limiter.buckets["county.example.com"]
+    # The first attempt and both retries took a token, and every 503 was reported once
+    assert bucket.requests == 3
+    assert bucket.throttled == 3
+    assert bucket.rate < 4.0
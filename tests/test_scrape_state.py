@@ -0,0 +1,73 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.fixtures import auction_payload
+from lib import scrape_state
+from lib.parse_data import ParseData
+
+SCHEDULED = '@AASTAT_MSGA ASTAT_LBL">Auction Starts@BASTAT_MSGB Astat_DATA">10:00 AM ET@B'
+SOLD = ('@AASTAT_MSGA ASTAT_LBL">Auction Sold@BASTAT_MSGB Astat_DATA">10/01/2026 10:05 AM ET@B'
+        '@AASTAT_MSGC ASTAT_LBL">Amount@BASTAT_MSGD Astat_DATA">$150,100.00@B')
+LINK = "https://www.realtor.com/realestateandhomes-detail/M1"
+
+
+def indexed(raw):
+    parse_data = ParseData()
+    html, auction_ids = parse_data.load_payload(raw)
+    return parse_data.index_items(html), auction_ids
+
+
+def first_scrape(item_index, auction_ids):
+    """Hashes and saved items of a first scrape, every item with a realtor.com link"""
+    records = ParseData().parse_records(item_index, auction_ids, "default", "10/01/2026")
+    saved = {}
+    for record in records:
+        record.realtor_link, record.enriched = LINK, True
+        saved[record.auction_id] = record.to_dict()
+    return {auction_id: scrape_state.item_hash(item_index[auction_id]) for auction_id in auction_ids}, saved
+
+
+def test_merge_items_adds_changes_and_removes():
+    item_index, auction_ids = indexed(auction_payload(3))
+    hashes, saved = first_scrape(item_index, auction_ids)
+
+    # 100000 is unchanged, 100001 was sold, 100002 left the date and 100005 is new
+    new_index = dict(item_index)
+    new_index["100001"] = item_index["100001"].replace(SCHEDULED, SOLD)
+    del new_index["100002"]
+    added_index, _ = indexed(auction_payload(1, first_id=100005))
+    new_index.update(added_index)
+    new_ids = ["100000", "100001", "100005"]
+
+    records, new_hashes, changes = scrape_state.merge_items(
+        ParseData(), new_index, new_ids, "default", hashes, saved, "10/01/2026")
+
+    assert changes == {"added": 1, "changed": 1, "removed": 1, "unchanged": 1}
+    assert [record.auction_id for record in records] == new_ids
+    assert list(new_hashes) == new_ids
+    assert new_hashes["100000"] == hashes["100000"]
+    assert new_hashes["100001"] != hashes["100001"]
+
+    unchanged, sold, added = records
+    assert unchanged.to_dict() == saved["100000"]
+    assert (sold.auction_status, sold.sold_amount_cents) == ("Sold", 15010000)
+    # Same address, so the link of the last scrape is kept
+    assert sold.realtor_link == LINK and sold.enriched
+    assert added.auction_status == "Scheduled"
+    assert not added.enriched
+
+
+def test_merge_items_parses_items_saved_without_a_status():
+    item_index, auction_ids = indexed(auction_payload(2))
+    hashes, saved = first_scrape(item_index, auction_ids)
+    for item in saved.values():
+        del item["auction_status"], item["sold_amount"]
+
+    records, _, changes = scrape_state.merge_items(
+        ParseData(), item_index, auction_ids, "default", hashes, saved, "10/01/2026")
+
+    assert changes == {"added": 0, "changed": 2, "removed": 0, "unchanged": 0}
+    assert [record.auction_status for record in records] == ["Scheduled", "Scheduled"]
+    assert all(record.realtor_link == LINK for record in records)
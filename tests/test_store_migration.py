@@ -0,0 +1,119 @@
+import json
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib.store import AuctionStore, SCHEMA_VERSION
+
+# auction_items as the first store created it, money as "$1,234.56" text
+V0_SCHEMA = """
+CREATE TABLE auction_dates (
+    county TEXT NOT NULL,
+    auction_date TEXT NOT NULL,
+    auction_day TEXT NOT NULL,
+    url TEXT,
+    scrape_date TEXT,
+    PRIMARY KEY (county, auction_date)
+);
+CREATE INDEX auction_dates_day ON auction_dates (auction_day);
+CREATE TABLE auction_items (
+    county TEXT NOT NULL,
+    auction_date TEXT NOT NULL,
+    auction_day TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    auction_id TEXT NOT NULL,
+    auction_type TEXT,
+    case_number TEXT,
+    parcel_id TEXT,
+    property_address TEXT,
+    final_judgment_amount TEXT,
+    assessed_value TEXT,
+    plaintiff_max_bid TEXT,
+    realtor_link TEXT,
+    item TEXT NOT NULL,
+    PRIMARY KEY (county, auction_date, position)
+);
+CREATE INDEX auction_items_day ON auction_items (auction_day, county);
+CREATE INDEX auction_items_parcel ON auction_items (parcel_id);
+"""
+
+ITEMS = [
+    {
+        "auction_id": "101", "auction_type": "FORECLOSURE", "case_number": "2024-CA-000101",
+        "final_judgment_amount": "$123,456.78", "parcel_id": "01-21-30-500-0000-0010",
+        "property_address": "123 MAIN ST, ORLANDO, FL-32801", "assessed_value": "$200,000.00",
+        "plaintiff_max_bid": "Hidden", "realtor_link": "https://www.realtor.com/realestateandhomes-detail/M1",
+    },
+    {
+        "auction_id": "102", "auction_type": "TAXDEED", "case_number": "2024-CA-000102",
+        "final_judgment_amount": "$5,000.01", "parcel_id": "02-21-30-500-0000-0020",
+        "property_address": "", "assessed_value": "", "plaintiff_max_bid": "$4,500.00",
+    },
+]
+
+
+def make_v0_store(path):
+    conn = sqlite3.connect(path)
+    conn.executescript(V0_SCHEMA)
+    conn.execute("INSERT INTO auction_dates VALUES ('ORANGE', '10/01/2026', '2026-10-01', 'u', '2026-09-30 10:00:00')")
+    for position, item in enumerate(ITEMS):
+        conn.execute(
+            "INSERT INTO auction_items VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            ("ORANGE", "10/01/2026", "2026-10-01", position, item["auction_id"], item["auction_type"],
+             item["case_number"], item["parcel_id"], item["property_address"], item["final_judgment_amount"],
+             item["assessed_value"], item["plaintiff_max_bid"], item.get("realtor_link"), json.dumps(item)),
+        )
+    conn.commit()
+    conn.close()
+
+
+def test_v0_store_is_upgraded(tmp_path):
+    path = str(tmp_path / "auctions.sqlite")
+    make_v0_store(path)
+
+    store = AuctionStore(path)
+    store.close()
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(auction_items)")]
+    for column in ("final_judgment_amount", "assessed_value", "plaintiff_max_bid"):
+        assert column not in columns
+        assert f"{column}_cents" in columns
+    indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {"auction_items_day", "auction_items_parcel"} <= indexes
+
+    rows = conn.execute(
+        "SELECT auction_id, final_judgment_amount_cents, assessed_value_cents, plaintiff_max_bid_cents, "
+        "realtor_link, item FROM auction_items ORDER BY position"
+    ).fetchall()
+    conn.close()
+    assert [row[:5] for row in rows] == [
+        ("101", 12345678, 20000000, None, ITEMS[0]["realtor_link"]),
+        ("102", 500001, None, 450000, None),
+    ]
+
+    first, second = (json.loads(row[5]) for row in rows)
+    assert first["final_judgment_amount"] == 123456.78
+    assert first["assessed_value"] == 200000.0
+    assert first["plaintiff_max_bid"] is None
+    assert first["hidden"] == ["plaintiff_max_bid"]
+    assert first["realtor_link"] == ITEMS[0]["realtor_link"]
+    assert second["assessed_value"] is None
+    assert second["plaintiff_max_bid"] == 4500.0
+    assert "realtor_link" not in second
+
+
+def test_upgraded_store_exports_legacy_items(tmp_path):
+    path = str(tmp_path / "auctions.sqlite")
+    make_v0_store(path)
+
+    store = AuctionStore(path)
+    store.export_json_tree(str(tmp_path / "data"))
+    store.close()
+
+    with open(tmp_path / "data" / "ORANGE" / "10_01_2026.json") as f:
+        data = json.load(f)
+    assert data["auction_items"] == ITEMS